@@ -14,6 +14,11 @@ import base64
 import io
 import threading
 import time
+import logging
+
+# Configure app-wide logging once (a no-op on Streamlit reruns, since the root
+# logger already has a handler by then)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
 
 # Try to import libraries for PDF and Excel export
 try:
@@ -2166,9 +2171,11 @@ def show_signup_page():
                         
                         # Send email notification to admin
                         try:
-                            from email_notifications import EmailNotifier
-                            email_notifier = EmailNotifier()
-                            email_notifier.send_new_user_notification(email)
+                            from email_notifications import get_email_notifier
+                            notifier = get_email_notifier()
+                            notifier.submit(
+                                notifier.notify_admin_new_signup, email, result['user_id']
+                            )
                             st.info("📧 Admin has been notified. Your account will be reviewed shortly.")
                         except Exception as e:
                             # Email notification is optional, don't fail registration
@@ -1,82 +1,125 @@
 #!/usr/bin/env python3
 """
-Convert DESIGN_DOCUMENT.md to PDF using markdown2 or weasyprint.
+Convert DESIGN_DOCUMENT.md to PDF using mistune and weasyprint.
 """
 
 import sys
 import os
+import re
+import shutil
+import unicodedata
+from functools import lru_cache
+
+# Stylesheet applied to the generated PDF
+PDF_STYLESHEET = '''
+@page {
+    size: A4;
+    margin: 2cm;
+}
+body {
+    font-family: 'Helvetica', 'Arial', sans-serif;
+    line-height: 1.6;
+    color: #333;
+}
+h1 {
+    color: #1f77b4;
+    border-bottom: 3px solid #1f77b4;
+    padding-bottom: 10px;
+}
+h2 {
+    color: #2c3e50;
+    margin-top: 30px;
+    border-bottom: 2px solid #ecf0f1;
+    padding-bottom: 5px;
+}
+h3 {
+    color: #34495e;
+    margin-top: 20px;
+}
+code {
+    background-color: #f4f4f4;
+    padding: 2px 5px;
+    border-radius: 3px;
+    font-family: 'Courier New', monospace;
+}
+pre {
+    background-color: #f4f4f4;
+    padding: 15px;
+    border-radius: 5px;
+    overflow-x: auto;
+}
+table {
+    border-collapse: collapse;
+    width: 100%;
+    margin: 20px 0;
+}
+th, td {
+    border: 1px solid #ddd;
+    padding: 12px;
+    text-align: left;
+}
+th {
+    background-color: #1f77b4;
+    color: white;
+}
+tr:nth-child(even) {
+    background-color: #f2f2f2;
+}
+'''
+
+
+def _slugify(text):
+    """Build a heading anchor the same way Python-Markdown's toc extension does."""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    text = re.sub(r'[^\w\s-]', '', text).strip().lower()
+    return re.sub(r'[-\s]+', '-', text)
+
+
+def _read_markdown(path='DESIGN_DOCUMENT.md'):
+    """Read the markdown source as bytes and decode it in a single pass."""
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8')
+
+
+@lru_cache(maxsize=1)
+def _get_markdown_renderer():
+    """Create the mistune renderer once (tables, fenced code, heading anchors)."""
+    import mistune
+    from mistune.toc import add_toc_hook
+    
+    md = mistune.create_markdown(plugins=['table', 'strikethrough'])
+    add_toc_hook(md, max_level=6, heading_id=lambda token, index: _slugify(token['text']))
+    return md
+
+
+@lru_cache(maxsize=1)
+def _get_stylesheet():
+    """Parse the PDF stylesheet once and share its font configuration."""
+    from weasyprint import CSS
+    from weasyprint.text.fonts import FontConfiguration
+    
+    font_config = FontConfiguration()
+    return CSS(string=PDF_STYLESHEET, font_config=font_config), font_config
+
 
 def convert_with_weasyprint():
-    """Convert markdown to PDF using weasyprint."""
+    """Convert markdown to PDF using mistune and weasyprint."""
     try:
-        from weasyprint import HTML, CSS
-        from markdown import markdown
+        from weasyprint import HTML
         
-        with open('DESIGN_DOCUMENT.md', 'r', encoding='utf-8') as f:
-            md_content = f.read()
+        md_content = _read_markdown()
         
         # Convert markdown to HTML
-        html_content = markdown(md_content, extensions=['tables', 'fenced_code', 'toc'])
+        html_content = _get_markdown_renderer()(md_content)
         
         # Add CSS styling
-        css = CSS(string='''
-            @page {
-                size: A4;
-                margin: 2cm;
-            }
-            body {
-                font-family: 'Helvetica', 'Arial', sans-serif;
-                line-height: 1.6;
-                color: #333;
-            }
-            h1 {
-                color: #1f77b4;
-                border-bottom: 3px solid #1f77b4;
-                padding-bottom: 10px;
-            }
-            h2 {
-                color: #2c3e50;
-                margin-top: 30px;
-                border-bottom: 2px solid #ecf0f1;
-                padding-bottom: 5px;
-            }
-            h3 {
-                color: #34495e;
-                margin-top: 20px;
-            }
-            code {
-                background-color: #f4f4f4;
-                padding: 2px 5px;
-                border-radius: 3px;
-                font-family: 'Courier New', monospace;
-            }
-            pre {
-                background-color: #f4f4f4;
-                padding: 15px;
-                border-radius: 5px;
-                overflow-x: auto;
-            }
-            table {
-                border-collapse: collapse;
-                width: 100%;
-                margin: 20px 0;
-            }
-            th, td {
-                border: 1px solid #ddd;
-                padding: 12px;
-                text-align: left;
-            }
-            th {
-                background-color: #1f77b4;
-                color: white;
-            }
-            tr:nth-child(even) {
-                background-color: #f2f2f2;
-            }
-        ''')
+        css, font_config = _get_stylesheet()
         
         # Convert to PDF
-        HTML(string=html_content).write_pdf('DESIGN_DOCUMENT.pdf', stylesheets=[css])
+        # base_url lets relative image links resolve against the document folder
+        HTML(string=html_content, base_url='.').write_pdf(
+            'DESIGN_DOCUMENT.pdf', stylesheets=[css], font_config=font_config
+        )
         print("✅ PDF created successfully: DESIGN_DOCUMENT.pdf")
         return True
         
@@ -86,12 +129,63 @@ def convert_with_weasyprint():
         print(f"❌ Error with weasyprint: {e}")
         return False
 
+def convert_with_pandoc():
+    """Convert markdown to PDF using pandoc (via pypandoc)."""
+    if not shutil.which('pandoc'):
+        return False
+    try:
+        import pypandoc
+        
+        pypandoc.convert_file('DESIGN_DOCUMENT.md', 'pdf', outputfile='DESIGN_DOCUMENT.pdf')
+        print("✅ PDF created successfully: DESIGN_DOCUMENT.pdf")
+        return True
+        
+    except ImportError:
+        return False
+    except Exception as e:
+        print(f"❌ Error with pandoc: {e}")
+        return False
+
+def convert_with_xhtml2pdf():
+    """Convert markdown to PDF using mistune and xhtml2pdf."""
+    try:
+        from xhtml2pdf import pisa
+        
+        md_content = _read_markdown()
+        
+        html_content = _get_markdown_renderer()(md_content)
+        html_document = f"<html><head><style>{PDF_STYLESHEET}</style></head><body>{html_content}</body></html>"
+        
+        with open('DESIGN_DOCUMENT.pdf', 'wb') as f:
+            result = pisa.CreatePDF(html_document, dest=f)
+        
+        if result.err:
+            print(f"❌ Error with xhtml2pdf: {result.err} error(s) during conversion")
+            return False
+        print("✅ PDF created successfully: DESIGN_DOCUMENT.pdf")
+        return True
+        
+    except ImportError:
+        return False
+    except Exception as e:
+        print(f"❌ Error with xhtml2pdf: {e}")
+        return False
+
 def convert_with_markdown_pdf():
     """Convert markdown to PDF using markdown-pdf."""
+    # Prefer a globally installed markdown-pdf (npm i -g markdown-pdf) so npx
+    # does not have to resolve/download the package on every run
+    if shutil.which('markdown-pdf'):
+        command = ['markdown-pdf']
+    elif shutil.which('npx'):
+        command = ['npx', '--yes', 'markdown-pdf']
+    else:
+        return False
+    
     try:
         import subprocess
         result = subprocess.run(
-            ['npx', '--yes', 'markdown-pdf', 'DESIGN_DOCUMENT.md', '-o', 'DESIGN_DOCUMENT.pdf'],
+            command + ['DESIGN_DOCUMENT.md', '-o', 'DESIGN_DOCUMENT.pdf'],
             capture_output=True,
             text=True
         )
@@ -114,12 +208,22 @@ def main():
     if convert_with_weasyprint():
         return
     
-    # Try markdown-pdf
+    # Try pandoc (native, fast when installed)
+    print("Attempting conversion with pandoc...")
+    if convert_with_pandoc():
+        return
+    
+    # Try xhtml2pdf (pure Python)
+    print("Attempting conversion with xhtml2pdf...")
+    if convert_with_xhtml2pdf():
+        return
+    
+    # Try markdown-pdf last: npx may need to download the package
     print("Attempting conversion with markdown-pdf (requires Node.js)...")
     if convert_with_markdown_pdf():
         return
     
-    # If both fail, provide instructions
+    # If all fail, provide instructions
     print("")
     print("❌ Automatic PDF conversion not available.")
     print("")
@@ -134,7 +238,7 @@ def main():
     print("  - Or use https://dillinger.io/ and export as PDF")
     print("")
     print("Option 3: Install Python packages and try again:")
-    print("  pip install weasyprint markdown")
+    print("  pip install weasyprint mistune")
     print("  python3 convert_to_pdf.py")
     print("")
     print("Option 4: Use VS Code with Markdown PDF extension")
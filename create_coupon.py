@@ -7,6 +7,31 @@ Run this to generate free subscription coupon codes.
 import sys
 from subscription_manager import SubscriptionManager, SUBSCRIPTION_TIERS
 from datetime import datetime, timedelta
+from typing import List
+
+# Shared manager instance (avoids re-running schema setup per coupon)
+_manager = None
+
+def get_manager() -> SubscriptionManager:
+    """Get the subscription manager instance."""
+    global _manager
+    if _manager is None:
+        _manager = SubscriptionManager()
+    return _manager
+
+def create_coupons_bulk(codes: List[str], tier: str = "free", max_uses: int = 1, days_valid: int = 365) -> int:
+    """Create many free-subscription coupon codes in one transaction.
+    
+    Returns the number of codes created (existing codes are skipped).
+    """
+    valid_until = datetime.now() + timedelta(days=days_valid)
+    return get_manager().create_coupon_codes(
+        codes=codes,
+        tier=tier,
+        discount_percent=100,
+        max_uses=max_uses,
+        valid_until=valid_until
+    )
 
 def create_coupon():
     """Create a coupon code interactively."""
@@ -36,8 +61,7 @@ def create_coupon():
     days_valid = int(days_valid_input) if days_valid_input else 365
     valid_until = datetime.now() + timedelta(days=days_valid)
     
-    manager = SubscriptionManager()
-    success = manager.create_coupon_code(
+    success = get_manager().create_coupon_code(
         code=code,
         tier=tier,
         discount_percent=100,
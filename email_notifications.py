@@ -4,109 +4,57 @@ Email Notification System for ReqIQ
 Handles sending emails for user approvals and notifications.
 """
 
+from __future__ import annotations
+
 import os
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Optional, Dict, Any
-from pathlib import Path
+import sys
+import copy
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Dict, Any, Callable, List, Tuple
 
+# smtplib/ssl and the email.mime package are imported on first send
+if TYPE_CHECKING:
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
 
-class EmailNotifier:
-    """Handle email notifications."""
-    
-    def __init__(self):
-        self.smtp_host = os.getenv('SMTP_HOST', 'smtp.gmail.com')
-        self.smtp_port = int(os.getenv('SMTP_PORT', '587'))
-        self.smtp_user = os.getenv('SMTP_USER', '')
-        self.smtp_password = os.getenv('SMTP_PASSWORD', '')
-        self.smtp_from = os.getenv('SMTP_FROM', self.smtp_user)
-        self.app_name = os.getenv('APP_NAME', 'ReqIQ')
-        self.app_url = os.getenv('APP_URL', 'http://localhost:8501')
-        self.admin_email = os.getenv('ADMIN_EMAIL', '')
-        
-        # Try to get from Streamlit secrets if available
-        try:
-            import streamlit as st
-            if hasattr(st, 'secrets'):
-                secrets = st.secrets
-                if 'email' in secrets:
-                    email_config = secrets['email']
-                    self.smtp_host = email_config.get('smtp_host', self.smtp_host)
-                    self.smtp_port = int(email_config.get('smtp_port', self.smtp_port))
-                    self.smtp_user = email_config.get('smtp_user', self.smtp_user)
-                    self.smtp_password = email_config.get('smtp_password', self.smtp_password)
-                    self.smtp_from = email_config.get('smtp_from', self.smtp_user)
-                if 'admin' in secrets:
-                    self.admin_email = secrets['admin'].get('email', self.admin_email)
-                if 'app' in secrets:
-                    self.app_name = secrets['app'].get('name', self.app_name)
-                    self.app_url = secrets['app'].get('url', self.app_url)
-        except:
-            pass  # Not in Streamlit context
-    
-    def _send_email(self, to_email: str, subject: str, body_html: str, body_text: str = None) -> bool:
-        """Send an email."""
-        if not self.smtp_user or not self.smtp_password:
-            print(f"⚠️ Email not configured. Would send to {to_email}: {subject}")
-            return False
-        
-        try:
-            msg = MIMEMultipart('alternative')
-            msg['From'] = self.smtp_from
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            if body_text:
-                msg.attach(MIMEText(body_text, 'plain'))
-            msg.attach(MIMEText(body_html, 'html'))
-            
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
-            
-            return True
-        except Exception as e:
-            print(f"❌ Failed to send email to {to_email}: {str(e)}")
-            return False
-    
-    def notify_admin_new_signup(self, user_email: str, user_id: str) -> bool:
-        """Notify admin of new user signup."""
-        if not self.admin_email:
-            print("⚠️ Admin email not configured. Cannot send notification.")
-            return False
-        
-        subject = f"🔔 New User Signup: {user_email}"
-        
-        html_body = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                <h2 style="color: #1f77b4;">New User Signup</h2>
-                <p>A new user has signed up and is pending approval:</p>
-                <div style="background: #f5f5f5; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                    <p><strong>Email:</strong> {user_email}</p>
-                    <p><strong>User ID:</strong> {user_id}</p>
-                </div>
-                <p>Please log in to the admin panel to approve or reject this user.</p>
-                <div style="margin: 30px 0; text-align: center;">
-                    <a href="{self.app_url}" 
-                       style="background: #1f77b4; color: white; padding: 12px 30px; 
-                              text-decoration: none; border-radius: 5px; display: inline-block;">
-                        Go to Admin Panel
-                    </a>
-                </div>
-                <hr style="border: none; border-top: 1px solid #eee; margin: 30px 0;">
-                <p style="color: #666; font-size: 12px;">
-                    This is an automated notification from {self.app_name}.
-                </p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_body = f"""
+logger = logging.getLogger(__name__)
+
+# Notification templates, rendered with str.format_map
+_ADMIN_SIGNUP_SUBJECT = "🔔 New User Signup: {user_email}"
+
+_ADMIN_SIGNUP_HTML = """
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+        <h2 style="color: #1f77b4;">New User Signup</h2>
+        <p>A new user has signed up and is pending approval:</p>
+        <div style="background: #f5f5f5; padding: 15px; border-radius: 5px; margin: 20px 0;">
+            <p><strong>Email:</strong> {user_email}</p>
+            <p><strong>User ID:</strong> {user_id}</p>
+        </div>
+        <p>Please log in to the admin panel to approve or reject this user.</p>
+        <div style="margin: 30px 0; text-align: center;">
+            <a href="{app_url}" 
+               style="background: #1f77b4; color: white; padding: 12px 30px; 
+                      text-decoration: none; border-radius: 5px; display: inline-block;">
+                Go to Admin Panel
+            </a>
+        </div>
+        <hr style="border: none; border-top: 1px solid #eee; margin: 30px 0;">
+        <p style="color: #666; font-size: 12px;">
+            This is an automated notification from {app_name}.
+        </p>
+    </div>
+</body>
+</html>
+"""
+
+_ADMIN_SIGNUP_TEXT = """
 New User Signup
 
 A new user has signed up and is pending approval:
@@ -115,55 +63,51 @@ Email: {user_email}
 User ID: {user_id}
 
 Please log in to the admin panel to approve or reject this user.
-Admin Panel: {self.app_url}
+Admin Panel: {app_url}
 
 ---
-This is an automated notification from {self.app_name}.
+This is an automated notification from {app_name}.
         """
-        
-        return self._send_email(self.admin_email, subject, html_body, text_body)
-    
-    def notify_user_approved(self, user_email: str) -> bool:
-        """Notify user their account has been approved."""
-        subject = f"✅ Your {self.app_name} Account Has Been Approved!"
-        
-        html_body = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                <h2 style="color: #28a745;">🎉 Account Approved!</h2>
-                <p>Great news! Your account has been approved and you can now access {self.app_name}.</p>
-                <div style="background: #d4edda; border: 1px solid #c3e6cb; padding: 15px; 
-                            border-radius: 5px; margin: 20px 0;">
-                    <p style="margin: 0;"><strong>Your account is now active!</strong></p>
-                </div>
-                <p>You can now log in and start using all the features:</p>
-                <ul>
-                    <li>Extract requirements from meeting transcripts</li>
-                    <li>Export to PDF, Excel, or Markdown</li>
-                    <li>Use local or cloud-based transcription</li>
-                    <li>And much more!</li>
-                </ul>
-                <div style="margin: 30px 0; text-align: center;">
-                    <a href="{self.app_url}" 
-                       style="background: #28a745; color: white; padding: 12px 30px; 
-                              text-decoration: none; border-radius: 5px; display: inline-block;">
-                        Login Now
-                    </a>
-                </div>
-                <hr style="border: none; border-top: 1px solid #eee; margin: 30px 0;">
-                <p style="color: #666; font-size: 12px;">
-                    If you have any questions, please contact support.
-                </p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_body = f"""
+
+_USER_APPROVED_SUBJECT = "✅ Your {app_name} Account Has Been Approved!"
+
+_USER_APPROVED_HTML = """
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+        <h2 style="color: #28a745;">🎉 Account Approved!</h2>
+        <p>Great news! Your account has been approved and you can now access {app_name}.</p>
+        <div style="background: #d4edda; border: 1px solid #c3e6cb; padding: 15px; 
+                    border-radius: 5px; margin: 20px 0;">
+            <p style="margin: 0;"><strong>Your account is now active!</strong></p>
+        </div>
+        <p>You can now log in and start using all the features:</p>
+        <ul>
+            <li>Extract requirements from meeting transcripts</li>
+            <li>Export to PDF, Excel, or Markdown</li>
+            <li>Use local or cloud-based transcription</li>
+            <li>And much more!</li>
+        </ul>
+        <div style="margin: 30px 0; text-align: center;">
+            <a href="{app_url}" 
+               style="background: #28a745; color: white; padding: 12px 30px; 
+                      text-decoration: none; border-radius: 5px; display: inline-block;">
+                Login Now
+            </a>
+        </div>
+        <hr style="border: none; border-top: 1px solid #eee; margin: 30px 0;">
+        <p style="color: #666; font-size: 12px;">
+            If you have any questions, please contact support.
+        </p>
+    </div>
+</body>
+</html>
+"""
+
+_USER_APPROVED_TEXT = """
 Account Approved!
 
-Great news! Your account has been approved and you can now access {self.app_name}.
+Great news! Your account has been approved and you can now access {app_name}.
 
 Your account is now active!
 
@@ -173,46 +117,40 @@ You can now log in and start using all the features:
 - Use local or cloud-based transcription
 - And much more!
 
-Login here: {self.app_url}
+Login here: {app_url}
 
 ---
 If you have any questions, please contact support.
         """
-        
-        return self._send_email(user_email, subject, html_body, text_body)
-    
-    def notify_user_rejected(self, user_email: str, reason: str = None) -> bool:
-        """Notify user their account has been rejected."""
-        subject = f"❌ Your {self.app_name} Account Request"
-        
-        reason_text = f"<p><strong>Reason:</strong> {reason}</p>" if reason else ""
-        
-        html_body = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                <h2 style="color: #dc3545;">Account Request Status</h2>
-                <p>We're sorry, but your account request has been declined at this time.</p>
-                {reason_text}
-                <div style="background: #f8d7da; border: 1px solid #f5c6cb; padding: 15px; 
-                            border-radius: 5px; margin: 20px 0;">
-                    <p style="margin: 0;">Your account is not active and you cannot access the application.</p>
-                </div>
-                <p>If you believe this is an error or would like more information, please contact support.</p>
-                <hr style="border: none; border-top: 1px solid #eee; margin: 30px 0;">
-                <p style="color: #666; font-size: 12px;">
-                    If you have any questions, please contact support.
-                </p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_body = f"""
+
+_USER_REJECTED_SUBJECT = "❌ Your {app_name} Account Request"
+
+_USER_REJECTED_HTML = """
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+        <h2 style="color: #dc3545;">Account Request Status</h2>
+        <p>We're sorry, but your account request has been declined at this time.</p>
+        {reason_html}
+        <div style="background: #f8d7da; border: 1px solid #f5c6cb; padding: 15px; 
+                    border-radius: 5px; margin: 20px 0;">
+            <p style="margin: 0;">Your account is not active and you cannot access the application.</p>
+        </div>
+        <p>If you believe this is an error or would like more information, please contact support.</p>
+        <hr style="border: none; border-top: 1px solid #eee; margin: 30px 0;">
+        <p style="color: #666; font-size: 12px;">
+            If you have any questions, please contact support.
+        </p>
+    </div>
+</body>
+</html>
+"""
+
+_USER_REJECTED_TEXT = """
 Account Request Status
 
 We're sorry, but your account request has been declined at this time.
-{('Reason: ' + reason) if reason else ''}
+{reason_line}
 
 Your account is not active and you cannot access the application.
 
@@ -221,8 +159,331 @@ If you believe this is an error or would like more information, please contact s
 ---
 If you have any questions, please contact support.
         """
+
+
+# Close pooled SMTP connections after this many seconds without use
+SMTP_IDLE_TIMEOUT_SECONDS = 100
+
+
+class _SmtpPool:
+    """Keep authenticated SMTP connections warm between sends, closing them when idle.
+    
+    Idle connections are kept per (host, port, user). A connection is handed
+    to one caller at a time, so concurrent senders never share a socket.
+    """
+    
+    __slots__ = ('idle_timeout', '_idle', '_lock', '_reaper')
+    
+    def __init__(self, idle_timeout: float = SMTP_IDLE_TIMEOUT_SECONDS):
+        self.idle_timeout = idle_timeout
+        self._idle: Dict[Tuple[str, int, str], List[Tuple[smtplib.SMTP, float]]] = {}
+        self._lock = threading.Lock()
+        self._reaper: Optional[threading.Timer] = None
+    
+    def acquire(self, key: Tuple[str, int, str], connect: Callable[[], smtplib.SMTP]) -> smtplib.SMTP:
+        """Get a live idle connection for key, or open a new one with connect()."""
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                entry = idle.pop() if idle else None
+            
+            if entry is None:
+                return connect()
+            
+            import smtplib
+            server, last_used = entry
+            if time.monotonic() - last_used < self.idle_timeout:
+                try:
+                    if server.noop()[0] == 250:
+                        return server
+                except (smtplib.SMTPException, OSError):
+                    pass
+            self._close(server)
+    
+    def release(self, key: Tuple[str, int, str], server: smtplib.SMTP):
+        """Return a healthy connection to the pool."""
+        with self._lock:
+            self._idle.setdefault(key, []).append((server, time.monotonic()))
+            if self._reaper is None:
+                self._schedule_reaper()
+    
+    def discard(self, server: smtplib.SMTP):
+        """Close a connection that should not be reused."""
+        self._close(server)
+    
+    def _schedule_reaper(self):
+        """Schedule the idle-connection sweep (caller holds the lock)."""
+        self._reaper = threading.Timer(self.idle_timeout, self._reap)
+        self._reaper.daemon = True
+        self._reaper.start()
+    
+    def _reap(self):
+        """Close connections that have been idle for longer than the timeout."""
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            self._reaper = None
+            for idle in self._idle.values():
+                expired.extend(server for server, last_used in idle if now - last_used >= self.idle_timeout)
+                idle[:] = [(server, last_used) for server, last_used in idle if now - last_used < self.idle_timeout]
+            if any(self._idle.values()):
+                self._schedule_reaper()
+        
+        for server in expired:
+            self._close(server)
+    
+    @staticmethod
+    def _close(server: smtplib.SMTP):
+        """Politely QUIT a connection, falling back to closing the socket."""
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+
+_smtp_pool = _SmtpPool()
+
+# Background senders; each worker acquires its own pooled SMTP connection, so
+# independent notifications overlap their connect/STARTTLS/AUTH round trips
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='mail')
+
+
+@functools.lru_cache(maxsize=2)
+def _message_template(with_text: bool) -> MIMEMultipart:
+    """Empty multipart/alternative skeleton (headers + text/html parts), built once per shape."""
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+    
+    msg = MIMEMultipart('alternative')
+    msg['From'] = ''
+    msg['To'] = ''
+    msg['Subject'] = ''
+    if with_text:
+        msg.attach(MIMEText('', 'plain', 'utf-8'))
+    msg.attach(MIMEText('', 'html', 'utf-8'))
+    return msg
+
+
+def _build_message(from_addr: str, to_email: str, subject: str, body_html: str,
+                   body_text: str = None) -> MIMEMultipart:
+    """Fill a copy of the cached skeleton; the shared template itself is never mutated."""
+    template = _message_template(bool(body_text))
+    msg = copy.copy(template)
+    # del rebinds the copy's header list rather than editing the template's
+    for name, value in (('From', from_addr), ('To', to_email), ('Subject', subject)):
+        del msg[name]
+        msg[name] = value
+    
+    bodies = (body_text, body_html) if body_text else (body_html,)
+    parts = []
+    for part, body in zip(template.get_payload(), bodies):
+        part = copy.copy(part)
+        del part['Content-Transfer-Encoding']  # re-added for the new body by set_payload
+        part.set_payload(body, 'utf-8')
+        parts.append(part)
+    msg.set_payload(parts)
+    return msg
+
+
+@dataclass(frozen=True, slots=True)
+class _EmailConfig:
+    """SMTP and app settings for email notifications."""
+    smtp_host: str
+    smtp_port: int
+    smtp_user: str
+    smtp_password: str
+    smtp_from: str
+    app_name: str
+    app_url: str
+    admin_email: str
+
+
+@functools.lru_cache(maxsize=1)
+def _load_config() -> _EmailConfig:
+    """Read email settings from environment, overridden by Streamlit secrets (once per process)."""
+    smtp_host = os.getenv('SMTP_HOST', 'smtp.gmail.com')
+    smtp_port = int(os.getenv('SMTP_PORT', '587'))
+    smtp_user = os.getenv('SMTP_USER', '')
+    smtp_password = os.getenv('SMTP_PASSWORD', '')
+    smtp_from = os.getenv('SMTP_FROM', smtp_user)
+    app_name = os.getenv('APP_NAME', 'ReqIQ')
+    app_url = os.getenv('APP_URL', 'http://localhost:8501')
+    admin_email = os.getenv('ADMIN_EMAIL', '')
+    
+    # Try to get from Streamlit secrets if running under Streamlit (it is
+    # never imported just for this, so CLI use stays cheap)
+    try:
+        st = sys.modules.get('streamlit')
+        if st is not None and hasattr(st, 'secrets'):
+            secrets = st.secrets
+            if 'email' in secrets:
+                email_config = secrets['email']
+                smtp_host = email_config.get('smtp_host', smtp_host)
+                smtp_port = int(email_config.get('smtp_port', smtp_port))
+                smtp_user = email_config.get('smtp_user', smtp_user)
+                smtp_password = email_config.get('smtp_password', smtp_password)
+                smtp_from = email_config.get('smtp_from', smtp_user)
+            if 'admin' in secrets:
+                admin_email = secrets['admin'].get('email', admin_email)
+            if 'app' in secrets:
+                app_name = secrets['app'].get('name', app_name)
+                app_url = secrets['app'].get('url', app_url)
+    except:
+        pass  # Not in Streamlit context
+    
+    return _EmailConfig(
+        smtp_host=smtp_host,
+        smtp_port=smtp_port,
+        smtp_user=smtp_user,
+        smtp_password=smtp_password,
+        smtp_from=smtp_from,
+        app_name=app_name,
+        app_url=app_url,
+        admin_email=admin_email,
+    )
+
+
+class EmailNotifier:
+    """Handle email notifications."""
+    
+    __slots__ = ('smtp_host', 'smtp_port', 'smtp_user', 'smtp_password', 'smtp_from',
+                 'app_name', 'app_url', 'admin_email')
+    
+    def __init__(self):
+        config = _load_config()
+        self.smtp_host = config.smtp_host
+        self.smtp_port = config.smtp_port
+        self.smtp_user = config.smtp_user
+        self.smtp_password = config.smtp_password
+        self.smtp_from = config.smtp_from
+        self.app_name = config.app_name
+        self.app_url = config.app_url
+        self.admin_email = config.admin_email
+    
+    def _pool_key(self) -> Tuple[str, int, str]:
+        """Key identifying interchangeable pooled connections."""
+        return self.smtp_host, self.smtp_port, self.smtp_user
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Open an SMTP connection and authenticate (STARTTLS + LOGIN)."""
+        import smtplib
+        server = smtplib.SMTP(self.smtp_host, self.smtp_port)
+        try:
+            server.starttls()
+            server.login(self.smtp_user, self.smtp_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    def _send_email(self, to_email: str, subject: str, body_html: str, body_text: str = None,
+                    server: Optional[smtplib.SMTP] = None) -> bool:
+        """Send an email, reusing an already authenticated server connection if given."""
+        if not self.smtp_user or not self.smtp_password:
+            logger.warning("Email not configured. Would send to %s: %s", to_email, subject)
+            return False
+        
+        try:
+            msg = _build_message(self.smtp_from, to_email, subject, body_html, body_text)
+            
+            if server is not None:
+                server.send_message(msg)
+                return True
+            
+            server = _smtp_pool.acquire(self._pool_key(), self._connect)
+            try:
+                server.send_message(msg)
+            except Exception:
+                _smtp_pool.discard(server)
+                raise
+            _smtp_pool.release(self._pool_key(), server)
+            return True
+        except Exception as e:
+            logger.error("Failed to send email to %s: %s", to_email, e)
+            return False
+    
+    def send_many(self, emails: List[Tuple[str, str, str, str]]) -> List[bool]:
+        """Send several (to_email, subject, body_html, body_text) emails over one SMTP connection."""
+        if not emails:
+            return []
+        if not self.smtp_user or not self.smtp_password:
+            return [self._send_email(*email) for email in emails]
+        
+        try:
+            server = _smtp_pool.acquire(self._pool_key(), self._connect)
+        except Exception as e:
+            logger.error("Failed to connect to SMTP server: %s", e)
+            return [False] * len(emails)
         
-        return self._send_email(user_email, subject, html_body, text_body)
+        results = [self._send_email(*email, server=server) for email in emails]
+        if all(results):
+            _smtp_pool.release(self._pool_key(), server)
+        else:
+            # A failed send may have left the connection in a bad state
+            _smtp_pool.discard(server)
+        return results
+    
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Run a notification (e.g. notifier.notify_user_approved) on the mail thread pool."""
+        return _executor.submit(fn, *args, **kwargs)
+    
+    def notify_admin_new_signup(self, user_email: str, user_id: str) -> bool:
+        """Notify admin of new user signup."""
+        if not self.admin_email:
+            logger.warning("Admin email not configured. Cannot send notification.")
+            return False
+        
+        return self._send_email(*self._admin_new_signup_email(user_email, user_id))
+    
+    def notify_user_approved(self, user_email: str) -> bool:
+        """Notify user their account has been approved."""
+        return self._send_email(*self._user_approved_email(user_email))
+    
+    def notify_user_rejected(self, user_email: str, reason: str = None) -> bool:
+        """Notify user their account has been rejected."""
+        return self._send_email(*self._user_rejected_email(user_email, reason))
+    
+    def _admin_new_signup_email(self, user_email: str, user_id: str) -> Tuple[str, str, str, str]:
+        """Build the admin new-signup email as (to, subject, html, text)."""
+        ctx = {
+            'user_email': user_email,
+            'user_id': user_id,
+            'app_name': self.app_name,
+            'app_url': self.app_url,
+        }
+        return (
+            self.admin_email,
+            _ADMIN_SIGNUP_SUBJECT.format_map(ctx),
+            _ADMIN_SIGNUP_HTML.format_map(ctx),
+            _ADMIN_SIGNUP_TEXT.format_map(ctx),
+        )
+    
+    def _user_approved_email(self, user_email: str) -> Tuple[str, str, str, str]:
+        """Build the account-approved email as (to, subject, html, text)."""
+        ctx = {'app_name': self.app_name, 'app_url': self.app_url}
+        return (
+            user_email,
+            _USER_APPROVED_SUBJECT.format_map(ctx),
+            _USER_APPROVED_HTML.format_map(ctx),
+            _USER_APPROVED_TEXT.format_map(ctx),
+        )
+    
+    def _user_rejected_email(self, user_email: str, reason: str = None) -> Tuple[str, str, str, str]:
+        """Build the account-rejected email as (to, subject, html, text)."""
+        ctx = {
+            'app_name': self.app_name,
+            'reason_html': f"<p><strong>Reason:</strong> {reason}</p>" if reason else "",
+            'reason_line': f"Reason: {reason}" if reason else "",
+        }
+        return (
+            user_email,
+            _USER_REJECTED_SUBJECT.format_map(ctx),
+            _USER_REJECTED_HTML.format_map(ctx),
+            _USER_REJECTED_TEXT.format_map(ctx),
+        )
 
 
 # Singleton instance
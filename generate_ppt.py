@@ -1,4 +1,17 @@
 from pptx import Presentation
+from pptx.oxml.xmlchemy import OxmlElement
+
+
+def build_paragraph(text):
+    """Build an <a:p> element holding a single text run."""
+    p = OxmlElement('a:p')
+    r = OxmlElement('a:r')
+    t = OxmlElement('a:t')
+    t.text = text
+    r.append(t)
+    p.append(r)
+    return p
+
 
 # Create presentation
 prs = Presentation()
@@ -44,20 +57,16 @@ sections = {
 }
 
 # Add slides
+content_layout = prs.slide_layouts[1]  # Title + Body layout
 for title_text, bullets in sections.items():
-    slide = prs.slides.add_slide(prs.slide_layouts[1])  # Title + Body layout
+    slide = prs.slides.add_slide(content_layout)
     slide.shapes.title.text = title_text
 
-    body = slide.shapes.placeholders[1].text_frame
-    body.clear()
-
-    for i, bullet in enumerate(bullets):
-        if i == 0:
-            body.text = bullet
-        else:
-            p = body.add_paragraph()
-            p.text = bullet
-            p.level = 0
+    # A new placeholder holds a single empty paragraph; swap it for all
+    # bullet paragraphs in one tree operation
+    tx_body = slide.shapes.placeholders[1].text_frame._txBody
+    tx_body.remove(tx_body.p_lst[0])
+    tx_body.extend([build_paragraph(bullet) for bullet in bullets])
 
 # Save file
 prs.save("Productivity_Changing_Requirements.pptx")
@@ -5,10 +5,13 @@ Supports Stripe with region-based currency conversion.
 """
 
 import os
-import json
+import functools
+import logging
+import importlib.util
+import time
 from typing import Dict, Optional, Tuple
-from datetime import datetime, timedelta
-import requests
+
+logger = logging.getLogger(__name__)
 
 # Currency conversion rates (updated periodically)
 # In production, use a real currency API like exchangerate-api.com
@@ -25,6 +28,27 @@ CURRENCY_RATES = {
     'AED': 3.67,
 }
 
+# How long a verified (paid) checkout session is served from memory
+VERIFY_CACHE_TTL_SECONDS = 300
+VERIFY_CACHE_MAX_ENTRIES = 1024
+
+# Optional live exchange-rate endpoint (exchangerate-api.com style JSON with a
+# "rates" or "conversion_rates" object keyed by currency, base USD)
+EXCHANGE_RATE_API_URL = os.getenv('EXCHANGE_RATE_API_URL', '')
+RATES_TTL_SECONDS = 3600
+
+# Rates scaled by 100 so price conversion stays in integer math
+_RATE_X100 = {currency: int(round(rate * 100)) for currency, rate in CURRENCY_RATES.items()}
+
+# Currencies Stripe charges in whole units (no cents)
+ZERO_DECIMAL_CURRENCIES = {'JPY'}
+
+# Subscription pricing in USD cents
+USD_PRICES_CENTS = {
+    'pro': 999,
+    'enterprise': 4999,
+}
+
 # Region to currency mapping
 REGION_CURRENCY = {
     'IN': 'INR',
@@ -63,26 +87,133 @@ CURRENCY_SYMBOLS = {
     'AED': 'د.إ',
 }
 
+# Case-insensitive lookup tables (upper- and lower-case keys) so hot lookups
+# skip the per-call .upper()
+_REGION_CURRENCY_LOOKUP = {**REGION_CURRENCY, **{region.lower(): currency for region, currency in REGION_CURRENCY.items()}}
+_CURRENCY_SYMBOL_LOOKUP = {**CURRENCY_SYMBOLS, **{currency.lower(): symbol for currency, symbol in CURRENCY_SYMBOLS.items()}}
+
+# Stripe wants lower-case currency codes; tiers are shown capitalized
+_CURRENCY_LOWER = {currency: currency.lower() for currency in CURRENCY_RATES}
+_TIER_TITLE = {tier: tier.capitalize() for tier in USD_PRICES_CENTS}
+
+
+@functools.lru_cache(maxsize=1)
+def _http_session():
+    """Shared keep-alive HTTP session for rate lookups (requests imported on first use)."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return session
+
+
+@functools.lru_cache(maxsize=1)
+def _rates_with_ttl(bucket: int) -> Dict[str, int]:
+    """Fetch live rates (scaled by 100) once per TTL bucket, falling back to CURRENCY_RATES."""
+    try:
+        response = _http_session().get(EXCHANGE_RATE_API_URL, timeout=5)
+        response.raise_for_status()
+        data = response.json()
+        live = data.get('rates') or data.get('conversion_rates') or {}
+        return {currency: int(round(float(live.get(currency, rate)) * 100))
+                for currency, rate in CURRENCY_RATES.items()}
+    except Exception as e:
+        logger.error("Error fetching exchange rates: %s", e)
+        return _RATE_X100
+
+
+def _current_rates_x100() -> Dict[str, int]:
+    """Rates scaled by 100: live (cached hourly) if an API is configured, else static."""
+    if not EXCHANGE_RATE_API_URL:
+        return _RATE_X100
+    return _rates_with_ttl(int(time.time() // RATES_TTL_SECONDS))
+
+
+def _currency_for_region(region: str) -> str:
+    """Get currency code for a region, only upper-casing unusual mixed-case input."""
+    currency = _REGION_CURRENCY_LOOKUP.get(region)
+    if currency is None:
+        currency = REGION_CURRENCY.get(region.upper(), 'USD')
+    return currency
+
+
+def _to_minor_units(usd_cents: int, currency: str) -> int:
+    """Convert a USD-cents amount to the currency's smallest unit, rounding half up."""
+    rate_x100 = _current_rates_x100().get(currency, 100)
+    if currency in ZERO_DECIMAL_CURRENCIES:
+        return (usd_cents * rate_x100 + 5000) // 10000
+    return (usd_cents * rate_x100 + 50) // 100
+
+
+def _from_minor_units(amount: int, currency: str) -> float:
+    """Convert a smallest-unit amount to a display amount."""
+    if currency in ZERO_DECIMAL_CURRENCIES:
+        return float(amount)
+    return amount / 100
+
+
+def _format_price(amount: float, currency: str) -> str:
+    """Format price with currency symbol."""
+    symbol = CURRENCY_SYMBOLS.get(currency, currency)
+    
+    if currency == 'JPY':
+        return f"{symbol}{int(amount):,}"
+    return f"{symbol}{amount:,.2f}"
+
+
+def _price_entry(usd_cents: int, currency: str) -> Tuple[int, str]:
+    """Smallest-unit amount and display string for a USD-cents price."""
+    amount = _to_minor_units(usd_cents, currency)
+    return amount, _format_price(_from_minor_units(amount, currency), currency)
+
+
+# (tier, currency) -> (amount in smallest unit, formatted price); with static
+# rates the tier x currency matrix is fixed, so it is computed once at import.
+# Live rates change hourly, so those prices are computed per call instead.
+_PRICE_DISPLAY = {} if EXCHANGE_RATE_API_URL else {
+    (tier, currency): _price_entry(usd_cents, currency)
+    for tier, usd_cents in USD_PRICES_CENTS.items()
+    for currency in CURRENCY_RATES
+}
+
 
 class PaymentGateway:
     """Handle payment processing with Stripe."""
     
+    __slots__ = ('stripe_secret_key', 'stripe_publishable_key', '_stripe', 'available')
+    
+    # session_id -> (verified_at monotonic time, result); paid sessions are final
+    _verify_cache: Dict[str, Tuple[float, Dict]] = {}
+    
     def __init__(self, stripe_secret_key: Optional[str] = None):
         self.stripe_secret_key = stripe_secret_key or os.getenv('STRIPE_SECRET_KEY')
         self.stripe_publishable_key = os.getenv('STRIPE_PUBLISHABLE_KEY', '')
         
+        self._stripe = None
+        
+        # Only check that Stripe is installed here; the SDK itself is imported on first use
         if self.stripe_secret_key:
-            try:
-                import stripe
-                stripe.api_key = self.stripe_secret_key
-                self.stripe = stripe
-                self.available = True
-            except ImportError:
-                self.available = False
-                print("Warning: Stripe not installed. Install with: pip install stripe")
+            self.available = importlib.util.find_spec('stripe') is not None
+            if not self.available:
+                logger.warning("Stripe not installed. Install with: pip install stripe")
         else:
             self.available = False
     
+    @property
+    def stripe(self):
+        """The configured Stripe module, imported on first access."""
+        if self._stripe is None:
+            import stripe
+            stripe.api_key = self.stripe_secret_key
+            # Keep-alive HTTP client on the shared session so calls reuse the TLS
+            # connection to api.stripe.com (RequestsClient is top-level from stripe 8)
+            requests_client = getattr(stripe, 'RequestsClient', None) or stripe.http_client.RequestsClient
+            if not isinstance(stripe.default_http_client, requests_client):
+                stripe.default_http_client = requests_client(session=_http_session())
+            self._stripe = stripe
+        return self._stripe
+    
     def detect_region(self) -> str:
         """Detect user's region based on IP or browser settings."""
         # Try to get from environment (can be set by reverse proxy/CDN)
@@ -96,28 +227,29 @@ class PaymentGateway:
     
     def get_currency_for_region(self, region: str) -> str:
         """Get currency code for a region."""
-        return REGION_CURRENCY.get(region.upper(), 'USD')
+        return _currency_for_region(region)
     
     def convert_price(self, usd_price: float, target_currency: str) -> float:
         """Convert USD price to target currency."""
         if target_currency == 'USD':
             return usd_price
         
-        rate = CURRENCY_RATES.get(target_currency, 1.0)
-        converted = usd_price * rate
-        
-        # Round to 2 decimal places (or 0 for JPY)
-        if target_currency == 'JPY':
-            return round(converted, 0)
-        return round(converted, 2)
+        # Rounded to 2 decimal places (or 0 for JPY) via integer minor units
+        amount = _to_minor_units(int(round(usd_price * 100)), target_currency)
+        return _from_minor_units(amount, target_currency)
     
     def format_price(self, amount: float, currency: str) -> str:
         """Format price with currency symbol."""
-        symbol = CURRENCY_SYMBOLS.get(currency, currency)
-        
-        if currency == 'JPY':
-            return f"{symbol}{int(amount):,}"
-        return f"{symbol}{amount:,.2f}"
+        return _format_price(amount, currency)
+    
+    def get_tier_price(self, tier: str, currency: str) -> Optional[Tuple[int, str]]:
+        """Get (amount in smallest unit, formatted price) for a tier in a currency."""
+        if tier not in USD_PRICES_CENTS:
+            return None
+        entry = _PRICE_DISPLAY.get((tier, currency))
+        if entry is None:
+            entry = _price_entry(USD_PRICES_CENTS[tier], currency)
+        return entry
     
     def create_checkout_session(
         self,
@@ -131,32 +263,22 @@ class PaymentGateway:
         if not self.available:
             return None
         
-        # Pricing in USD
-        usd_prices = {
-            'pro': 9.99,
-            'enterprise': 49.99,
-        }
-        
-        if tier not in usd_prices:
+        price = self.get_tier_price(tier, currency)
+        if price is None:
             return None
         
-        usd_price = usd_prices[tier]
-        local_price = self.convert_price(usd_price, currency)
-        
-        # Convert to cents (or smallest unit)
-        if currency == 'JPY':
-            amount = int(local_price)
-        else:
-            amount = int(local_price * 100)
+        # Amount in cents (or smallest unit), precomputed with integer math
+        amount = price[0]
+        local_price = _from_minor_units(amount, currency)
         
         try:
             session = self.stripe.checkout.Session.create(
                 payment_method_types=['card'],
                 line_items=[{
                     'price_data': {
-                        'currency': currency.lower(),
+                        'currency': _CURRENCY_LOWER.get(currency) or currency.lower(),
                         'product_data': {
-                            'name': f'ReqIQ {tier.capitalize()} Subscription',
+                            'name': f'ReqIQ {_TIER_TITLE[tier]} Subscription',
                             'description': f'Monthly subscription for {tier} tier',
                         },
                         'unit_amount': amount,
@@ -167,7 +289,8 @@ class PaymentGateway:
                     'quantity': 1,
                 }],
                 mode='subscription',
-                success_url=success_url or f'http://localhost:8501/?payment=success&tier={tier}&session_id={session.id}',
+                # Stripe fills in {CHECKOUT_SESSION_ID} when it redirects back
+                success_url=success_url or f'http://localhost:8501/?payment=success&tier={tier}&session_id={{CHECKOUT_SESSION_ID}}',
                 cancel_url=cancel_url or f'http://localhost:8501/?payment=cancelled',
                 metadata={
                     'user_id': user_id,
@@ -183,7 +306,7 @@ class PaymentGateway:
                 'currency': currency,
             }
         except Exception as e:
-            print(f"Error creating Stripe session: {e}")
+            logger.error("Error creating Stripe session: %s", e)
             return None
     
     def verify_payment(self, session_id: str) -> Optional[Dict]:
@@ -191,21 +314,41 @@ class PaymentGateway:
         if not self.available:
             return None
         
+        cached = self._verify_cache.get(session_id)
+        if cached:
+            if time.monotonic() - cached[0] < VERIFY_CACHE_TTL_SECONDS:
+                return dict(cached[1])
+            self._verify_cache.pop(session_id, None)
+        
         try:
             session = self.stripe.checkout.Session.retrieve(session_id)
             
             if session.payment_status == 'paid':
-                return {
+                result = {
                     'success': True,
                     'tier': session.metadata.get('tier'),
                     'user_id': session.metadata.get('user_id'),
                     'amount_paid': session.amount_total / 100,
                     'currency': session.currency.upper(),
                 }
+                self._cache_verified(session_id, result)
+                return dict(result)
             return None
         except Exception as e:
-            print(f"Error verifying payment: {e}")
+            logger.error("Error verifying payment: %s", e)
             return None
+    
+    def _cache_verified(self, session_id: str, result: Dict):
+        """Remember a paid session, evicting expired entries once the cache is full."""
+        cache = self._verify_cache
+        now = time.monotonic()
+        if len(cache) >= VERIFY_CACHE_MAX_ENTRIES:
+            for key, (verified_at, _) in list(cache.items()):
+                if now - verified_at >= VERIFY_CACHE_TTL_SECONDS:
+                    cache.pop(key, None)
+            if len(cache) >= VERIFY_CACHE_MAX_ENTRIES:
+                cache.clear()
+        cache[session_id] = (now, result)
 
 
 def get_user_region() -> str:
@@ -220,12 +363,17 @@ def get_currency_info(region: str = None) -> Dict:
     if not region:
         region = get_user_region()
     
-    currency = REGION_CURRENCY.get(region.upper(), 'USD')
-    symbol = CURRENCY_SYMBOLS.get(currency, currency)
-    
-    return {
-        'region': region,
-        'currency': currency,
-        'symbol': symbol,
-    }
+    return dict(_currency_info(region))
+
 
+@functools.lru_cache(maxsize=64)
+def _currency_info(region: str) -> Tuple[Tuple[str, str], ...]:
+    """Resolve currency and symbol for a region (region codes are low-cardinality)."""
+    currency = _currency_for_region(region)
+    symbol = _CURRENCY_SYMBOL_LOOKUP.get(currency, currency)
+    
+    return (
+        ('region', region),
+        ('currency', currency),
+        ('symbol', symbol),
+    )
@@ -5,13 +5,209 @@ Extracts and structures requirements from Microsoft Teams meeting discussions.
 """
 
 import json
+import functools
 import re
 import argparse
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, Iterator, Optional
 from datetime import datetime
-import openai
-from openai import OpenAI
+
+if TYPE_CHECKING:
+    import requests
+
+# Try to import orjson for faster JSON load/dump
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Transcript line patterns
+# "[Speaker] text"
+_BRACKET_SPEAKER_RE = re.compile(r'^\[([^\]]+)\]\s*(.+)$')
+# WebVTT voice span "<v Speaker>text</v>"
+_VTT_V_RE = re.compile(r'<v\s+([^>]+)>(.+)</v>')
+
+# Outermost {...} span in an LLM reply that may wrap JSON in extra text
+_OLLAMA_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# Common speech-to-text errors in business terms, matched case-insensitively in
+# one pass; the group name selects the replacement from _CORRECTIONS
+_CORRECTIONS_RE = re.compile(
+    # Every correction starts at a word boundary on p/r/s/f; checking that
+    # once up front lets the engine skip most positions without trying the
+    # alternatives. Atomic groups and possessive quantifiers (Python 3.11+)
+    # keep the match from backtracking on adversarial input.
+    r'\b(?=[prsf])(?:'
+    # PO number corrections
+    r'(?P<po_number>(?>Pyo|p\.o\.)\s++number\b)'
+    r'|(?P<po_before_number>Pyo\b(?=\s*+number))'
+    # Supplier corrections
+    r'|(?P<suppliers>(?>sublatures|subletters)\b)'
+    r'|(?P<supplier>(?>sublature|subletter)\b)'
+    # Common abbreviations
+    r'|(?P<sow>S\.O\.W\.\b)'
+    r'|(?P<rfp>R\.F\.P\.\b)'
+    r'|(?P<po>P\.O\.\b)'
+    # Common word corrections in business context
+    r'|(?P<forecast>forcast\b)'
+    r'|(?P<forecasting>forcasting\b))',
+    re.IGNORECASE,
+)
+
+_CORRECTIONS = {
+    'po_number': 'PO number',
+    'po_before_number': 'PO',
+    'suppliers': 'suppliers',
+    'supplier': 'supplier',
+    'sow': 'SOW',
+    'rfp': 'RFP',
+    'po': 'PO',
+    'forecast': 'forecast',
+    'forecasting': 'forecasting',
+}
+
+# Joins a batch of messages for trigger screening
+_MESSAGE_SEP = '\x00'
+
+# Lower-case literals, one of which every _CORRECTIONS_RE match contains
+_TRIGGER_TOKENS = ('pyo', 'p.o.', 'sublat', 'sublet', 's.o.w.', 'r.f.p.', 'forcast')
+
+# Corrections that keep the capitalization of a title-case original
+_CASE_PRESERVING_CORRECTIONS = {'suppliers', 'supplier'}
+
+
+def _correct_term(match: 're.Match[str]') -> str:
+    """Replacement for one _CORRECTIONS_RE match."""
+    name = match.lastgroup or ''
+    replacement = _CORRECTIONS[name]
+    if name in _CASE_PRESERVING_CORRECTIONS and match.group().istitle():
+        return replacement.capitalize()
+    return replacement
+
+
+@functools.lru_cache(maxsize=1)
+def _ollama_session() -> 'requests.Session':
+    """Keep-alive HTTP session shared by all Ollama calls."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    session = requests.Session()
+    session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+    return session
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse UTF-8 JSON bytes, with orjson when available."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # Let the stdlib parser accept (or report) what orjson rejects, e.g. NaN
+    return json.loads(data.decode('utf-8'))
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize to 2-space indented JSON, keeping non-ASCII characters as-is."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; the stdlib encoder handles those
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+def _write_output(path: str, text: str) -> None:
+    """Write text to path as UTF-8 with one encode and unbuffered writes."""
+    data = memoryview(text.encode('utf-8'))
+    with open(path, 'wb', buffering=0) as f:
+        # Raw writes may be partial; slicing the memoryview avoids copying the rest
+        while data:
+            data = data[f.write(data):]
+
+
+def _clean_texts(texts: List[str]) -> List[str]:
+    """Clean a batch of messages, screening the whole batch for trigger terms at once."""
+    if all(type(text) is str for text in texts):
+        # Trigger tokens contain no separator character, so none can span two messages
+        lowered = _MESSAGE_SEP.join(texts).lower()
+        if not any(token in lowered for token in _TRIGGER_TOKENS):
+            return texts
+    return [_clean_transcript_text(text) for text in texts]
+
+
+def _iter_lines(path: str) -> Iterator[str]:
+    """Yield a text file's lines one at a time instead of reading it whole."""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from f
+
+
+def _read_ollama_stream(response: 'requests.Response') -> str:
+    """
+    Collect a streamed Ollama /api/generate reply.
+    
+    Returns as soon as a complete top-level JSON object has arrived (closing the
+    stream early), otherwise the full generated text.
+    """
+    parts: List[str] = []
+    length = 0
+    start: Optional[int] = None
+    depth = 0
+    in_string = escaped = False
+    
+    for line in response.iter_lines():
+        if not line:
+            continue
+        chunk = json.loads(line)
+        piece = chunk.get('response', '')
+        parts.append(piece)
+        
+        # Track brace depth outside JSON strings to spot the end of the object
+        for i, ch in enumerate(piece):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == '\\':
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '{':
+                if start is None:
+                    start = length + i
+                depth += 1
+            elif start is None:
+                continue
+            elif ch == '"':
+                in_string = True
+            elif ch == '}':
+                depth -= 1
+                if depth == 0:
+                    text = ''.join(parts)
+                    candidate = text[start:length + i + 1]
+                    try:
+                        json.loads(candidate)
+                        return candidate
+                    except json.JSONDecodeError:
+                        start = None
+        length += len(piece)
+        
+        if chunk.get('done'):
+            break
+    
+    return ''.join(parts)
+
+
+def _clean_transcript_text(text: str) -> str:
+    """Clean and correct common speech-to-text transcription errors."""
+    if not text:
+        return text
+    
+    # Most utterances contain no trigger term; skip the regex for those
+    lowered = text.lower()
+    if not any(token in lowered for token in _TRIGGER_TOKENS):
+        return text
+    
+    return _CORRECTIONS_RE.sub(_correct_term, text)
 
 
 class TranscriptParser:
@@ -20,98 +216,108 @@ class TranscriptParser:
     @staticmethod
     def parse_text(transcript_path: str) -> List[Dict[str, Any]]:
         """Parse plain text transcript file."""
-        with open(transcript_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
         # Try to extract speaker and text patterns
         # Common formats: "Speaker Name: text" or "[Speaker] text"
-        lines = content.split('\n')
-        messages = []
+        lines = _iter_lines(transcript_path)
+        messages: List[Dict[str, Any]] = []
+        # Text pieces per message, joined once at the end so long runs of
+        # continuation lines don't re-copy the growing text
+        text_parts: List[List[str]] = []
         
         for line in lines:
             line = line.strip()
             if not line:
                 continue
             
-            # Pattern: "Speaker: message"
-            match = re.match(r'^([^:]+):\s*(.+)$', line)
-            if match:
-                speaker, text = match.groups()
-                messages.append({
-                    'speaker': speaker.strip(),
-                    'text': text.strip(),
-                    'timestamp': None
-                })
-            # Pattern: "[Speaker] message"
-            elif re.match(r'^\[([^\]]+)\]\s*(.+)$', line):
-                match = re.match(r'^\[([^\]]+)\]\s*(.+)$', line)
-                speaker, text = match.groups()
+            # Pattern: "Speaker: message" (split at the first colon)
+            speaker, _, text = line.partition(':')
+            if not (speaker and text):
+                # Pattern: "[Speaker] message"
+                match = _BRACKET_SPEAKER_RE.match(line) if line[0] == '[' else None
+                if match:
+                    speaker, text = match.group(1, 2)
+                else:
+                    speaker = ''
+            if speaker:
                 messages.append({
                     'speaker': speaker.strip(),
-                    'text': text.strip(),
+                    'text': None,
                     'timestamp': None
                 })
+                text_parts.append([text.strip()])
             else:
                 # Assume continuation or standalone message
                 if messages:
-                    messages[-1]['text'] += ' ' + line
+                    text_parts[-1].append(line)
                 else:
                     messages.append({
                         'speaker': 'Unknown',
-                        'text': line,
+                        'text': None,
                         'timestamp': None
                     })
+                    text_parts.append([line])
+        
+        for message, parts in zip(messages, text_parts):
+            message['text'] = ' '.join(parts)
         
         return messages
     
     @staticmethod
     def parse_vtt(transcript_path: str) -> List[Dict[str, Any]]:
         """Parse WebVTT format transcript."""
-        with open(transcript_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        messages = []
-        lines = content.split('\n')
-        current_cue = None
-        current_text = []
+        messages: List[Dict[str, Any]] = []
+        lines = _iter_lines(transcript_path)
+        # Current cue; its text buffer is cleared and reused for each cue
+        in_cue = False
+        cue_timestamp: Optional[str] = None
+        cue_speaker = 'Unknown'
+        current_text: List[str] = []
         
         for line in lines:
             line = line.strip()
+            if not line:
+                continue
+            
+            # Dispatch on the first character so plain caption text skips the
+            # prefix checks and the voice-tag regex
+            first = line[0]
             
-            # Skip VTT header and empty lines
-            if not line or line.startswith('WEBVTT') or line.startswith('NOTE'):
+            # Skip VTT header and notes
+            if (first == 'W' and line.startswith('WEBVTT')) or (first == 'N' and line.startswith('NOTE')):
                 continue
             
             # Timestamp line (e.g., "00:00:10.000 --> 00:00:15.000")
             if '-->' in line:
-                if current_cue and current_text:
+                if in_cue and current_text:
                     messages.append({
-                        'speaker': current_cue.get('speaker', 'Unknown'),
+                        'speaker': cue_speaker,
                         'text': ' '.join(current_text),
-                        'timestamp': current_cue.get('timestamp')
+                        'timestamp': cue_timestamp
                     })
-                current_cue = {'timestamp': line}
-                current_text = []
+                in_cue = True
+                cue_timestamp = line
+                cue_speaker = 'Unknown'
+                current_text.clear()
             # Speaker identification (often in brackets or as first part)
-            elif line.startswith('<v ') or line.startswith('['):
+            elif first == '[' or (first == '<' and line.startswith('<v ')):
                 if current_text:
                     current_text.append(line)
             else:
                 # Extract speaker if in format <v Speaker>text</v>
-                speaker_match = re.match(r'<v\s+([^>]+)>(.+)</v>', line)
+                speaker_match = _VTT_V_RE.match(line) if first == '<' else None
                 if speaker_match:
                     speaker, text = speaker_match.groups()
-                    current_cue['speaker'] = speaker.strip()
+                    cue_speaker = speaker.strip()
                     current_text.append(text.strip())
                 else:
                     current_text.append(line)
         
         # Add last message
-        if current_cue and current_text:
+        if in_cue and current_text:
             messages.append({
-                'speaker': current_cue.get('speaker', 'Unknown'),
+                'speaker': cue_speaker,
                 'text': ' '.join(current_text),
-                'timestamp': current_cue.get('timestamp')
+                'timestamp': cue_timestamp
             })
         
         return messages
@@ -119,10 +325,10 @@ class TranscriptParser:
     @staticmethod
     def parse_json(transcript_path: str) -> List[Dict[str, Any]]:
         """Parse JSON format transcript (Teams export format)."""
-        with open(transcript_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(transcript_path, 'rb') as f:
+            data = _json_loads(f.read())
         
-        messages = []
+        messages: List[Dict[str, Any]] = []
         
         # Handle different JSON structures
         if isinstance(data, list):
@@ -150,20 +356,134 @@ class TranscriptParser:
     @staticmethod
     def parse_json_items(items: List[Dict]) -> List[Dict[str, Any]]:
         """Helper to parse JSON items."""
-        messages = []
+        if not items:
+            return []
+        
+        # Exports normally use one schema throughout: resolve which key supplies
+        # each field from the first item and reuse that for items with the same keys
+        first_keys = items[0].keys()
+        speaker_key = next((k for k in ('speaker', 'name', 'user') if k in first_keys), None)
+        text_key = next((k for k in ('text', 'content', 'message') if k in first_keys), None)
+        timestamp_key = next((k for k in ('timestamp', 'time', 'startTime') if k in first_keys), None)
+        
+        messages: List[Dict[str, Any]] = []
         for item in items:
-            messages.append({
-                'speaker': item.get('speaker', item.get('name', item.get('user', 'Unknown'))),
-                'text': item.get('text', item.get('content', item.get('message', ''))),
-                'timestamp': item.get('timestamp', item.get('time', item.get('startTime')))
-            })
+            if item.keys() == first_keys:
+                messages.append({
+                    'speaker': item.get(speaker_key, 'Unknown'),
+                    'text': item.get(text_key, ''),
+                    'timestamp': item.get(timestamp_key)
+                })
+            else:
+                messages.append({
+                    'speaker': item.get('speaker', item.get('name', item.get('user', 'Unknown'))),
+                    'text': item.get('text', item.get('content', item.get('message', ''))),
+                    'timestamp': item.get('timestamp', item.get('time', item.get('startTime')))
+                })
         return messages
 
 
+# Prompts sent with every extraction, formatted once per call with str.format
+_SYSTEM_PROMPT = "You are an expert business analyst who extracts requirements from meeting discussions. Extract functional requirements, non-functional requirements, constraints, assumptions, and action items. Return structured JSON.\n\nIMPORTANT: Correct common transcription errors:\n- \"Pyo number\" or \"P.O. number\" should be \"PO number\" (Purchase Order number)\n- \"sublatures\" or \"subletters\" should be \"suppliers\"\n- Always use standard business terminology in extracted requirements."
+
+_OLLAMA_PROMPT_PREFIX = """You are an expert business analyst who extracts requirements from meeting discussions. 
+Extract functional requirements, non-functional requirements, constraints, assumptions, and action items. Return structured JSON.
+
+IMPORTANT: Correct common transcription errors:
+- "Pyo number" or "P.O. number" should be "PO number" (Purchase Order number)
+- "sublatures" or "subletters" should be "suppliers"
+- Always use standard business terminology in extracted requirements.""" + "\n\n"
+_OLLAMA_PROMPT_SUFFIX = "\n\nIMPORTANT: Return ONLY valid JSON, no other text."
+
+_FEEDBACK_TEMPLATE = """
+
+**USER FEEDBACK AND CORRECTIONS:**
+{feedback}
+
+Please incorporate this feedback into your extraction:
+- Apply any corrections mentioned in the feedback
+- Focus on areas highlighted in the feedback
+- Adjust extraction based on user guidance
+"""
+
+_PROMPT_TEMPLATE = """Analyze the following meeting transcript and extract all requirements, decisions, and action items.{feedback_section}
+
+**IMPORTANT: Business Terminology Context**
+- "PO number" or "P.O. number" refers to Purchase Order number
+- "supplier" or "vendor" refers to external suppliers/vendors (NOT "sublatures", "subletters", or similar)
+- Correct any speech-to-text transcription errors in business terms
+- Recognize common business abbreviations: PO (Purchase Order), SOW (Statement of Work), RFP (Request for Proposal), etc.
+
+Meeting Transcript:
+{conversation}
+
+Please extract and structure the following information in JSON format:
+1. **Functional Requirements**: Features, functionalities, and capabilities discussed
+2. **Non-Functional Requirements**: Performance, security, usability, scalability requirements
+3. **Business Rules**: Rules, constraints, and business logic mentioned (including PO numbers, supplier requirements, etc.)
+4. **Assumptions**: Any assumptions made during the discussion
+5. **Action Items**: Tasks assigned with owners and deadlines if mentioned
+6. **Decisions**: Key decisions made during the meeting
+7. **Stakeholders**: People mentioned and their roles/interests (including suppliers, vendors, partners)
+
+**Terminology Guidelines:**
+- Always use "PO number" or "Purchase Order number" (never "Pyo number", "P.O.", etc.)
+- Always use "supplier" or "vendor" (never "sublatures", "subletters", etc.)
+- Correct common speech-to-text errors in business terminology
+- Preserve exact numbers, codes, and identifiers mentioned
+
+For each requirement, include:
+- ID (auto-generated)
+- Description (with corrected business terminology)
+- Priority (if mentioned: High/Medium/Low)
+- Source speaker
+- Related discussion context
+
+Return the result as a JSON object with the following structure:
+{{
+  "functional_requirements": [
+    {{
+      "id": "FR-001",
+      "description": "...",
+      "priority": "High/Medium/Low",
+      "speaker": "...",
+      "context": "..."
+    }}
+  ],
+  "non_functional_requirements": [...],
+  "business_rules": [...],
+  "assumptions": [...],
+  "action_items": [
+    {{
+      "id": "AI-001",
+      "task": "...",
+      "owner": "...",
+      "deadline": "...",
+      "status": "Open"
+    }}
+  ],
+  "decisions": [
+    {{
+      "id": "D-001",
+      "decision": "...",
+      "rationale": "...",
+      "decision_maker": "..."
+    }}
+  ],
+  "stakeholders": [
+    {{
+      "name": "...",
+      "role": "...",
+      "interests": "..."
+    }}
+  ]
+}}"""
+
+
 class RequirementsExtractor:
     """Extract requirements from meeting transcripts using AI."""
     
-    def __init__(self, api_key: str = None, model: str = "gpt-4o-mini", use_ollama: bool = False, ollama_model: str = "llama3.2"):
+    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o-mini", use_ollama: bool = False, ollama_model: str = "llama3.2"):
         """
         Initialize the extractor.
         
@@ -180,8 +500,9 @@ class RequirementsExtractor:
             # Check if Ollama is available
             try:
                 import requests
+                self._session = _ollama_session()
                 try:
-                    response = requests.get("http://localhost:11434/api/tags", timeout=3)
+                    response = self._session.get("http://localhost:11434/api/tags", timeout=3)
                     if response.status_code == 200:
                         self.ollama_available = True
                         # Check if the specified model is available
@@ -222,6 +543,8 @@ class RequirementsExtractor:
                 )
                 raise ValueError(install_instructions)
         else:
+            # Imported here so parsing and formatting never load the OpenAI SDK
+            from openai import OpenAI
             if api_key:
                 self.client = OpenAI(api_key=api_key)
             else:
@@ -234,7 +557,7 @@ class RequirementsExtractor:
                     )
         self.model = model
     
-    def extract_requirements(self, messages: List[Dict[str, Any]], feedback: str = None) -> Dict[str, Any]:
+    def extract_requirements(self, messages: List[Dict[str, Any]], feedback: Optional[str] = None) -> Dict[str, Any]:
         """
         Extract requirements from transcript messages.
         
@@ -255,38 +578,29 @@ class RequirementsExtractor:
         try:
             if self.use_ollama:
                 # Use Ollama local LLM
-                import requests
+                full_prompt = f"{_OLLAMA_PROMPT_PREFIX}{prompt}{_OLLAMA_PROMPT_SUFFIX}"
                 
-                system_prompt = """You are an expert business analyst who extracts requirements from meeting discussions. 
-Extract functional requirements, non-functional requirements, constraints, assumptions, and action items. Return structured JSON.
-
-IMPORTANT: Correct common transcription errors:
-- "Pyo number" or "P.O. number" should be "PO number" (Purchase Order number)
-- "sublatures" or "subletters" should be "suppliers"
-- Always use standard business terminology in extracted requirements."""
-                
-                full_prompt = f"{system_prompt}\n\n{prompt}\n\nIMPORTANT: Return ONLY valid JSON, no other text."
-                
-                response = requests.post(
+                # Stream tokens so reading stops as soon as the JSON object is complete
+                with self._session.post(
                     "http://localhost:11434/api/generate",
                     json={
                         "model": self.ollama_model,
                         "prompt": full_prompt,
-                        "stream": False,
+                        "stream": True,
                         "options": {
                             "temperature": 0.3
                         }
                     },
+                    stream=True,
                     timeout=300  # 5 minutes timeout for large transcripts
-                )
-                
-                if response.status_code != 200:
-                    raise Exception(f"Ollama API error: {response.status_code} - {response.text}")
-                
-                result_text = response.json().get("response", "")
+                ) as response:
+                    if response.status_code != 200:
+                        raise Exception(f"Ollama API error: {response.status_code} - {response.text}")
+                    
+                    result_text = _read_ollama_stream(response)
                 
                 # Try to extract JSON from response (Ollama might add extra text)
-                json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
+                json_match = _OLLAMA_JSON_RE.search(result_text)
                 if json_match:
                     result = json.loads(json_match.group())
                 else:
@@ -301,7 +615,7 @@ IMPORTANT: Correct common transcription errors:
                     messages=[
                         {
                             "role": "system",
-                            "content": "You are an expert business analyst who extracts requirements from meeting discussions. Extract functional requirements, non-functional requirements, constraints, assumptions, and action items. Return structured JSON.\n\nIMPORTANT: Correct common transcription errors:\n- \"Pyo number\" or \"P.O. number\" should be \"PO number\" (Purchase Order number)\n- \"sublatures\" or \"subletters\" should be \"suppliers\"\n- Always use standard business terminology in extracted requirements."
+                            "content": _SYSTEM_PROMPT
                         },
                         {
                             "role": "user",
@@ -322,48 +636,17 @@ IMPORTANT: Correct common transcription errors:
     
     def _clean_transcript_text(self, text: str) -> str:
         """Clean and correct common speech-to-text transcription errors."""
-        if not text:
-            return text
-        
-        # Common business term corrections
-        corrections = {
-            # PO number corrections
-            r'\b(Pyo|PYO|p\.o\.|P\.O\.)\s+number\b': 'PO number',
-            r'\b(Pyo|PYO)\s+Number\b': 'PO Number',
-            r'\b(Pyo|PYO)\b(?=\s*(number|Number))': 'PO',
-            
-            # Supplier corrections
-            r'\bsublatures\b': 'suppliers',
-            r'\bsublature\b': 'supplier',
-            r'\bSublatures\b': 'Suppliers',
-            r'\bSublature\b': 'Supplier',
-            r'\bsubletters\b': 'suppliers',
-            r'\bsubletter\b': 'supplier',
-            
-            # Common abbreviations
-            r'\bS\.O\.W\.\b': 'SOW',
-            r'\bR\.F\.P\.\b': 'RFP',
-            r'\bP\.O\.\b': 'PO',
-            
-            # Common word corrections in business context
-            r'\bforcast\b': 'forecast',
-            r'\bforcasting\b': 'forecasting',
-        }
-        
-        cleaned = text
-        for pattern, replacement in corrections.items():
-            cleaned = re.sub(pattern, replacement, cleaned, flags=re.IGNORECASE)
-        
-        return cleaned
+        return _clean_transcript_text(text)
     
     def _format_conversation(self, messages: List[Dict[str, Any]]) -> str:
         """Format messages into a readable conversation."""
-        formatted = []
-        for msg in messages:
+        texts = [msg.get('text', '') for msg in messages]
+        # Clean transcription errors, screening each batch of messages at once
+        cleaned = _clean_texts(texts)
+        
+        formatted: List[str] = []
+        for msg, text in zip(messages, cleaned):
             speaker = msg.get('speaker', 'Unknown')
-            text = msg.get('text', '')
-            # Clean transcription errors
-            text = self._clean_transcript_text(text)
             timestamp = msg.get('timestamp', '')
             
             if timestamp:
@@ -373,102 +656,34 @@ IMPORTANT: Correct common transcription errors:
         
         return '\n'.join(formatted)
     
-    def _create_extraction_prompt(self, conversation: str, feedback: str = None) -> str:
+    def _create_extraction_prompt(self, conversation: str, feedback: Optional[str] = None) -> str:
         """Create prompt for requirement extraction."""
         feedback_section = ""
         if feedback and feedback.strip():
-            feedback_section = f"""
-
-**USER FEEDBACK AND CORRECTIONS:**
-{feedback}
-
-Please incorporate this feedback into your extraction:
-- Apply any corrections mentioned in the feedback
-- Focus on areas highlighted in the feedback
-- Adjust extraction based on user guidance
-"""
+            feedback_section = _FEEDBACK_TEMPLATE.format(feedback=feedback)
         
-        return f"""Analyze the following meeting transcript and extract all requirements, decisions, and action items.{feedback_section}
-
-**IMPORTANT: Business Terminology Context**
-- "PO number" or "P.O. number" refers to Purchase Order number
-- "supplier" or "vendor" refers to external suppliers/vendors (NOT "sublatures", "subletters", or similar)
-- Correct any speech-to-text transcription errors in business terms
-- Recognize common business abbreviations: PO (Purchase Order), SOW (Statement of Work), RFP (Request for Proposal), etc.
-
-Meeting Transcript:
-{conversation}
-
-Please extract and structure the following information in JSON format:
-1. **Functional Requirements**: Features, functionalities, and capabilities discussed
-2. **Non-Functional Requirements**: Performance, security, usability, scalability requirements
-3. **Business Rules**: Rules, constraints, and business logic mentioned (including PO numbers, supplier requirements, etc.)
-4. **Assumptions**: Any assumptions made during the discussion
-5. **Action Items**: Tasks assigned with owners and deadlines if mentioned
-6. **Decisions**: Key decisions made during the meeting
-7. **Stakeholders**: People mentioned and their roles/interests (including suppliers, vendors, partners)
-
-**Terminology Guidelines:**
-- Always use "PO number" or "Purchase Order number" (never "Pyo number", "P.O.", etc.)
-- Always use "supplier" or "vendor" (never "sublatures", "subletters", etc.)
-- Correct common speech-to-text errors in business terminology
-- Preserve exact numbers, codes, and identifiers mentioned
-
-For each requirement, include:
-- ID (auto-generated)
-- Description (with corrected business terminology)
-- Priority (if mentioned: High/Medium/Low)
-- Source speaker
-- Related discussion context
-
-Return the result as a JSON object with the following structure:
-{{
-  "functional_requirements": [
-    {{
-      "id": "FR-001",
-      "description": "...",
-      "priority": "High/Medium/Low",
-      "speaker": "...",
-      "context": "..."
-    }}
-  ],
-  "non_functional_requirements": [...],
-  "business_rules": [...],
-  "assumptions": [...],
-  "action_items": [
-    {{
-      "id": "AI-001",
-      "task": "...",
-      "owner": "...",
-      "deadline": "...",
-      "status": "Open"
-    }}
-  ],
-  "decisions": [
-    {{
-      "id": "D-001",
-      "decision": "...",
-      "rationale": "...",
-      "decision_maker": "..."
-    }}
-  ],
-  "stakeholders": [
-    {{
-      "name": "...",
-      "role": "...",
-      "interests": "..."
-    }}
-  ]
-}}"""
+        return _PROMPT_TEMPLATE.format(feedback_section=feedback_section, conversation=conversation)
 
 
 class RequirementsFormatter:
     """Format extracted requirements into readable output."""
     
     @staticmethod
-    def format_markdown(requirements: Dict[str, Any], output_path: str = None) -> str:
+    def _requirement_block(req: Dict[str, Any]) -> str:
+        """Markdown for one requirement, laid out as its separate newline-joined parts were."""
+        context = f"**Context:** {req['context']}\n\n" if req.get('context') else ""
+        return (
+            f"### {req.get('id', 'N/A')}\n\n"
+            f"**Description:** {req.get('description', 'N/A')}\n\n"
+            f"**Priority:** {req.get('priority', 'Not specified')}\n\n"
+            f"**Source:** {req.get('speaker', 'Unknown')}\n\n"
+            f"{context}\n"
+        )
+    
+    @staticmethod
+    def format_markdown(requirements: Dict[str, Any], output_path: Optional[str] = None) -> str:
         """Format requirements as Markdown."""
-        md = []
+        md: List[str] = []
         md.append("# Requirements Extracted from Meeting\n")
         md.append(f"*Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n")
         md.append("---\n")
@@ -476,35 +691,23 @@ class RequirementsFormatter:
         # Functional Requirements
         if requirements.get('functional_requirements'):
             md.append("## Functional Requirements\n")
-            for req in requirements['functional_requirements']:
-                md.append(f"### {req.get('id', 'N/A')}\n")
-                md.append(f"**Description:** {req.get('description', 'N/A')}\n")
-                md.append(f"**Priority:** {req.get('priority', 'Not specified')}\n")
-                md.append(f"**Source:** {req.get('speaker', 'Unknown')}\n")
-                if req.get('context'):
-                    md.append(f"**Context:** {req.get('context')}\n")
-                md.append("\n")
+            md.extend(RequirementsFormatter._requirement_block(req) for req in requirements['functional_requirements'])
         
         # Non-Functional Requirements
         if requirements.get('non_functional_requirements'):
             md.append("## Non-Functional Requirements\n")
-            for req in requirements['non_functional_requirements']:
-                md.append(f"### {req.get('id', 'N/A')}\n")
-                md.append(f"**Description:** {req.get('description', 'N/A')}\n")
-                md.append(f"**Priority:** {req.get('priority', 'Not specified')}\n")
-                md.append(f"**Source:** {req.get('speaker', 'Unknown')}\n")
-                if req.get('context'):
-                    md.append(f"**Context:** {req.get('context')}\n")
-                md.append("\n")
+            md.extend(RequirementsFormatter._requirement_block(req) for req in requirements['non_functional_requirements'])
         
         # Business Rules
         if requirements.get('business_rules'):
             md.append("## Business Rules\n")
             for rule in requirements['business_rules']:
-                md.append(f"### {rule.get('id', 'N/A')}\n")
-                md.append(f"**Rule:** {rule.get('description', rule.get('rule', 'N/A'))}\n")
-                md.append(f"**Source:** {rule.get('speaker', 'Unknown')}\n")
-                md.append("\n")
+                md.append(
+                    f"### {rule.get('id', 'N/A')}\n\n"
+                    f"**Rule:** {rule.get('description', rule.get('rule', 'N/A'))}\n\n"
+                    f"**Source:** {rule.get('speaker', 'Unknown')}\n\n"
+                    "\n"
+                )
         
         # Assumptions
         if requirements.get('assumptions'):
@@ -524,37 +727,39 @@ class RequirementsFormatter:
         if requirements.get('decisions'):
             md.append("\n## Decisions\n")
             for decision in requirements['decisions']:
-                md.append(f"### {decision.get('id', 'N/A')}\n")
-                md.append(f"**Decision:** {decision.get('decision', 'N/A')}\n")
-                md.append(f"**Rationale:** {decision.get('rationale', 'N/A')}\n")
-                md.append(f"**Decision Maker:** {decision.get('decision_maker', 'Unknown')}\n")
-                md.append("\n")
+                md.append(
+                    f"### {decision.get('id', 'N/A')}\n\n"
+                    f"**Decision:** {decision.get('decision', 'N/A')}\n\n"
+                    f"**Rationale:** {decision.get('rationale', 'N/A')}\n\n"
+                    f"**Decision Maker:** {decision.get('decision_maker', 'Unknown')}\n\n"
+                    "\n"
+                )
         
         # Stakeholders
         if requirements.get('stakeholders'):
             md.append("## Stakeholders\n")
             for stakeholder in requirements['stakeholders']:
-                md.append(f"### {stakeholder.get('name', 'Unknown')}\n")
-                md.append(f"**Role:** {stakeholder.get('role', 'N/A')}\n")
-                md.append(f"**Interests:** {stakeholder.get('interests', 'N/A')}\n")
-                md.append("\n")
+                md.append(
+                    f"### {stakeholder.get('name', 'Unknown')}\n\n"
+                    f"**Role:** {stakeholder.get('role', 'N/A')}\n\n"
+                    f"**Interests:** {stakeholder.get('interests', 'N/A')}\n\n"
+                    "\n"
+                )
         
         result = '\n'.join(md)
         
         if output_path:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(result)
+            _write_output(output_path, result)
         
         return result
     
     @staticmethod
-    def format_json(requirements: Dict[str, Any], output_path: str = None) -> str:
+    def format_json(requirements: Dict[str, Any], output_path: Optional[str] = None) -> str:
         """Format requirements as JSON."""
-        json_str = json.dumps(requirements, indent=2, ensure_ascii=False)
+        json_str = _json_dumps(requirements)
         
         if output_path:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(json_str)
+            _write_output(output_path, json_str)
         
         return json_str
 
@@ -4,21 +4,54 @@ Security Module for ReqIQ
 Handles authentication, authorization, input validation, and rate limiting.
 """
 
+import os
 import re
 import hashlib
+import hmac
 import secrets
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
-from pathlib import Path
-import streamlit as st
+import threading
+import time
+from collections import deque
+from typing import Optional, Dict, Any, List, Deque, Tuple
 
 # File upload security
-ALLOWED_EXTENSIONS = {'.txt', '.vtt', '.json', '.mp4', '.mov', '.avi', '.mkv', '.webm', '.mpeg4'}
+ALLOWED_EXTENSIONS = frozenset({'.txt', '.vtt', '.json', '.mp4', '.mov', '.avi', '.mkv', '.webm', '.mpeg4'})
 MAX_FILE_SIZE_MB = 1024  # 1GB default, can be overridden by subscription
 
 # Input validation patterns
 EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
 COUPON_CODE_PATTERN = re.compile(r'^[A-Z0-9]{4,20}$')
+# OpenAI keys: "sk-" followed by URL-safe characters, longer than 20 in total
+API_KEY_PATTERN = re.compile(r'sk-[A-Za-z0-9_-]{18,}')
+
+# Sliding-window rate limits: "action:user_id" -> (window seconds, monotonic
+# times of the requests still inside the window), per process
+_RATE_BUCKETS: Dict[str, Tuple[float, Deque[float]]] = {}
+_rate_lock = threading.Lock()
+
+# Idle buckets are swept once this many exist; the threshold doubles when a
+# sweep frees little, so sweeping stays amortized O(1) per check
+RATE_BUCKETS_SWEEP_THRESHOLD = 1024
+_rate_sweep_at = RATE_BUCKETS_SWEEP_THRESHOLD
+
+
+def _sweep_rate_buckets(now: float):
+    """Drop buckets with no requests left in their window (call with _rate_lock held)."""
+    global _rate_sweep_at
+    stale = [
+        key for key, (window_seconds, timestamps) in _RATE_BUCKETS.items()
+        if not timestamps or timestamps[-1] <= now - window_seconds
+    ]
+    for key in stale:
+        del _RATE_BUCKETS[key]
+    _rate_sweep_at = max(RATE_BUCKETS_SWEEP_THRESHOLD, 2 * len(_RATE_BUCKETS))
+
+# Path traversal and shell/Windows-reserved characters rejected in upload names
+_BAD_FILENAME_RE = re.compile(r'\.\.|[/\\<>|:*?]')
+
+# Markup stripped by sanitize_input
+_SCRIPT_RE = re.compile(r'<script[^>]*>.*?</script>', re.IGNORECASE | re.DOTALL)
+_JS_RE = re.compile(r'javascript:', re.IGNORECASE)
 
 
 class SecurityManager:
@@ -30,17 +63,23 @@ class SecurityManager:
         errors = []
         
         # Check file extension
-        file_extension = Path(uploaded_file.name).suffix.lower()
+        file_extension = os.path.splitext(uploaded_file.name)[1].lower()
         if file_extension not in ALLOWED_EXTENSIONS:
             errors.append(f"File type '{file_extension}' is not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}")
         
         # Check file size (-1 means unlimited)
-        file_size_mb = len(uploaded_file.getvalue()) / (1024 * 1024)
+        size_bytes = getattr(uploaded_file, 'size', None)
+        if size_bytes is None:
+            # Measure by seeking to the end rather than copying the contents
+            position = uploaded_file.tell()
+            size_bytes = uploaded_file.seek(0, 2)
+            uploaded_file.seek(position)
+        file_size_mb = size_bytes / (1024 * 1024)
         if max_size_mb > 0 and file_size_mb > max_size_mb:
             errors.append(f"File size ({file_size_mb:.2f} MB) exceeds maximum allowed size ({max_size_mb} MB)")
         
         # Check for suspicious file names
-        if any(char in uploaded_file.name for char in ['..', '/', '\\', '<', '>', '|', ':', '*', '?']):
+        if _BAD_FILENAME_RE.search(uploaded_file.name):
             errors.append("File name contains invalid characters")
         
         if errors:
@@ -53,14 +92,23 @@ class SecurityManager:
         """Validate email format."""
         if not email or not isinstance(email, str):
             return False
-        return bool(EMAIL_PATTERN.match(email.strip()))
+        email = email.strip()
+        # Cheap rejection before the regex: needs a local part and a dot after the last '@'
+        at = email.rfind('@')
+        if at < 1 or '.' not in email[at:]:
+            return False
+        return bool(EMAIL_PATTERN.match(email))
     
     @staticmethod
     def validate_coupon_code(code: str) -> bool:
         """Validate coupon code format."""
         if not code or not isinstance(code, str):
             return False
-        return bool(COUPON_CODE_PATTERN.match(code.strip().upper()))
+        code = code.strip()
+        # Codes are usually entered upper-case already; only upper() on a miss
+        if COUPON_CODE_PATTERN.fullmatch(code):
+            return True
+        return bool(COUPON_CODE_PATTERN.fullmatch(code.upper()))
     
     @staticmethod
     def sanitize_input(text: str, max_length: int = 10000) -> str:
@@ -69,16 +117,22 @@ class SecurityManager:
             return ""
         
         # Remove null bytes
-        text = text.replace('\x00', '')
+        if '\x00' in text:
+            text = text.replace('\x00', '')
         
         # Truncate if too long
         if len(text) > max_length:
             text = text[:max_length]
         
         # Remove potentially dangerous characters (but keep newlines for transcripts)
-        # Only remove script tags and similar
-        text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.IGNORECASE | re.DOTALL)
-        text = re.sub(r'javascript:', '', text, flags=re.IGNORECASE)
+        # Only remove script tags and similar. For ASCII text a lower-cased copy
+        # tells whether either pattern can match, so most input skips the regexes.
+        lowered = text.lower() if text.isascii() else None
+        if lowered is None or '<script' in lowered:
+            text = _SCRIPT_RE.sub('', text)
+            lowered = None  # removing a tag can splice a new 'javascript:' together
+        if lowered is None or 'javascript:' in lowered:
+            text = _JS_RE.sub('', text)
         
         return text.strip()
     
@@ -87,61 +141,69 @@ class SecurityManager:
         """Validate OpenAI API key format."""
         if not api_key or not isinstance(api_key, str):
             return False
-        return api_key.startswith('sk-') and len(api_key) > 20
+        return bool(API_KEY_PATTERN.fullmatch(api_key))
     
     @staticmethod
     def check_rate_limit(user_id: str, action: str, max_requests: int = 10, window_minutes: int = 60) -> Dict[str, Any]:
         """Check rate limit for user actions."""
-        # Use Streamlit session state for rate limiting
-        rate_limit_key = f"rate_limit_{action}_{user_id}"
-        
-        if rate_limit_key not in st.session_state:
-            st.session_state[rate_limit_key] = {
-                "count": 0,
-                "window_start": datetime.now()
-            }
-        
-        rate_data = st.session_state[rate_limit_key]
-        window_start = datetime.fromisoformat(rate_data["window_start"]) if isinstance(rate_data["window_start"], str) else rate_data["window_start"]
-        
-        # Reset if window expired
-        if datetime.now() - window_start > timedelta(minutes=window_minutes):
-            rate_data["count"] = 0
-            rate_data["window_start"] = datetime.now().isoformat()
-        
-        # Check limit
-        if rate_data["count"] >= max_requests:
+        window_seconds = window_minutes * 60
+        now = time.monotonic()
+        cutoff = now - window_seconds
+        
+        rate_limit_key = f"{action}:{user_id}"
+        
+        with _rate_lock:
+            if len(_RATE_BUCKETS) >= _rate_sweep_at:
+                _sweep_rate_buckets(now)
+            
+            bucket = _RATE_BUCKETS.get(rate_limit_key)
+            if bucket is None:
+                timestamps: Deque[float] = deque()
+            else:
+                timestamps = bucket[1]
+                # Drop requests that have left the window
+                while timestamps and timestamps[0] <= cutoff:
+                    timestamps.popleft()
+            _RATE_BUCKETS[rate_limit_key] = (window_seconds, timestamps)
+            
+            # Check limit
+            if len(timestamps) >= max_requests:
+                return {
+                    "allowed": False,
+                    "message": f"Rate limit exceeded. Maximum {max_requests} requests per {window_minutes} minutes.",
+                    "retry_after": timestamps[0] + window_seconds - now if timestamps else window_seconds
+                }
+            
+            timestamps.append(now)
             return {
-                "allowed": False,
-                "message": f"Rate limit exceeded. Maximum {max_requests} requests per {window_minutes} minutes.",
-                "retry_after": (window_start + timedelta(minutes=window_minutes) - datetime.now()).total_seconds()
+                "allowed": True,
+                "remaining": max_requests - len(timestamps)
             }
-        
-        # Increment counter
-        rate_data["count"] += 1
-        st.session_state[rate_limit_key] = rate_data
-        
-        return {
-            "allowed": True,
-            "remaining": max_requests - rate_data["count"]
-        }
     
     @staticmethod
     def generate_csrf_token() -> str:
         """Generate CSRF token for forms."""
-        if 'csrf_token' not in st.session_state:
-            st.session_state.csrf_token = secrets.token_urlsafe(32)
-        return st.session_state.csrf_token
+        import streamlit as st
+        # One lookup on the warm path; the token is only generated on first use
+        token = st.session_state.get('csrf_token')
+        if token is None:
+            token = st.session_state.csrf_token = secrets.token_urlsafe(32)
+        return token
     
     @staticmethod
     def validate_csrf_token(token: str) -> bool:
         """Validate CSRF token."""
-        return token == st.session_state.get('csrf_token', '')
+        import streamlit as st
+        if not isinstance(token, str):
+            return False
+        # Constant-time compare; bytes so non-ASCII input can't raise TypeError
+        return hmac.compare_digest(token.encode(), st.session_state.get('csrf_token', '').encode())
 
 
 def require_subscription(func):
     """Decorator to require active subscription for a function."""
     def wrapper(*args, **kwargs):
+        import streamlit as st
         from subscription_manager import SubscriptionManager, generate_user_id
         
         user_id = generate_user_id()
@@ -5,18 +5,68 @@ Handles subscriptions, coupon codes, and usage tracking.
 """
 
 import sqlite3
-import os
+import logging
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-import hashlib
+from typing import Optional, Dict, Any, List, Tuple
 import secrets
 import json
 import sys
+import threading
+import time
+import queue
+import atexit
+from collections import Counter
+
+# Try to import orjson for faster metadata serialization
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
 
 # Database path
 DB_PATH = Path.home() / ".reqiq_subscriptions.db"
 
+# Per-thread SQLite connections, keyed by database path
+_local = threading.local()
+
+# Applied to every new connection: WAL lets readers run alongside the
+# usage-tracking writes, and with WAL, synchronous=NORMAL only syncs at
+# checkpoints instead of on every commit
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # 256 MiB
+)
+
+# get_user_subscription result cache (per process)
+SUBSCRIPTION_CACHE_TTL_SECONDS = 60
+SUBSCRIPTION_CACHE_MAX_ENTRIES = 1024
+
+# (database path, user_id) -> (cached_at monotonic time, subscription or None, end_date_epoch)
+_subscription_cache: Dict[Tuple[str, str], Tuple[float, Optional[Dict[str, Any]], Optional[int]]] = {}
+
+# Unix-epoch copies of ISO date columns, compared as integers instead of
+# parsing the text; (table, epoch column, ISO column) for migrating old databases
+EPOCH_MIGRATION_COLUMNS = [
+    ('subscriptions', 'end_date_epoch', 'end_date'),
+    ('coupon_codes', 'valid_until_epoch', 'valid_until'),
+]
+
+# track_usage rows are buffered and written in batches by a background thread
+USAGE_FLUSH_BATCH_SIZE = 100
+USAGE_FLUSH_INTERVAL_SECONDS = 2.0
+
+# (database path, user_id, action_type, action_date, metadata JSON) awaiting insert
+_usage_queue: "queue.SimpleQueue[Tuple[str, str, str, str, Optional[str]]]" = queue.SimpleQueue()
+_usage_flush_lock = threading.Lock()
+_usage_batch_ready = threading.Event()
+_usage_flusher: Optional[threading.Thread] = None
+
 # Subscription tiers
 SUBSCRIPTION_TIERS = {
     "free": {
@@ -43,6 +93,91 @@ SUBSCRIPTION_TIERS = {
 }
 
 
+def _get_connection(db_path: Path) -> sqlite3.Connection:
+    """Get this thread's connection to db_path, opening it on first use."""
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    key = str(db_path)
+    conn = connections.get(key)
+    if conn is None:
+        # Every query is a fixed string, so statements prepared once are reused
+        conn = sqlite3.connect(key, cached_statements=256)
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        connections[key] = conn
+    return conn
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize usage metadata to JSON, with orjson when available."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj).decode('utf-8')
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; the stdlib encoder handles those
+    return json.dumps(obj)
+
+
+def _flush_usage():
+    """Write all buffered usage rows, one transaction per database."""
+    # Held until the rows are committed, so a reader that flushes first
+    # never counts while another thread has rows in flight. The queue is only
+    # checked once the lock is held: an empty queue can mean a batch is mid-write.
+    with _usage_flush_lock:
+        if _usage_queue.empty():
+            return
+        rows_by_db: Dict[str, List[Tuple[str, str, str, Optional[str]]]] = {}
+        while True:
+            try:
+                db_path, *row = _usage_queue.get_nowait()
+            except queue.Empty:
+                break
+            rows_by_db.setdefault(db_path, []).append(tuple(row))
+        
+        for db_path, rows in rows_by_db.items():
+            try:
+                conn = _get_connection(Path(db_path))
+                # Monthly counters are keyed by the UTC 'YYYY-MM' prefix of action_date
+                counts = Counter(
+                    (user_id, action_date[:7], action_type)
+                    for user_id, action_type, action_date, _ in rows
+                )
+                with conn:
+                    conn.executemany("""
+                        INSERT INTO usage_tracking (user_id, action_type, action_date, metadata)
+                        VALUES (?, ?, ?, ?)
+                    """, rows)
+                    conn.executemany("""
+                        INSERT INTO usage_counters (user_id, period, action_type, n)
+                        VALUES (?, ?, ?, ?)
+                        ON CONFLICT(user_id, period, action_type) DO UPDATE SET n = n + excluded.n
+                    """, [(*key, n) for key, n in counts.items()])
+            except Exception as e:
+                # Put the rows back for the next flush rather than losing them
+                for row in rows:
+                    _usage_queue.put((db_path, *row))
+                logger.error("Error recording %d usage rows, requeued: %s", len(rows), e)
+
+
+def _usage_flush_loop():
+    """Flush buffered usage rows every interval, or sooner when a batch fills."""
+    while True:
+        _usage_batch_ready.wait(USAGE_FLUSH_INTERVAL_SECONDS)
+        _usage_batch_ready.clear()
+        _flush_usage()
+
+
+def _start_usage_flusher():
+    """Start the background usage writer once per process."""
+    global _usage_flusher
+    with _usage_flush_lock:
+        if _usage_flusher is None:
+            _usage_flusher = threading.Thread(target=_usage_flush_loop, name="usage-flush", daemon=True)
+            _usage_flusher.start()
+            atexit.register(_flush_usage)
+
+
 class SubscriptionManager:
     """Manage user subscriptions and coupon codes."""
     
@@ -52,7 +187,7 @@ class SubscriptionManager:
     
     def _init_database(self):
         """Initialize database tables."""
-        conn = sqlite3.connect(str(self.db_path))
+        conn = _get_connection(self.db_path)
         cursor = conn.cursor()
         
         # Users table
@@ -74,6 +209,7 @@ class SubscriptionManager:
                 status TEXT NOT NULL DEFAULT 'active',
                 start_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 end_date TIMESTAMP,
+                end_date_epoch INTEGER,
                 coupon_code TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(user_id)
@@ -90,6 +226,7 @@ class SubscriptionManager:
                 current_uses INTEGER DEFAULT 0,
                 valid_from TIMESTAMP,
                 valid_until TIMESTAMP,
+                valid_until_epoch INTEGER,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
@@ -106,24 +243,57 @@ class SubscriptionManager:
             )
         """)
         
+        # Per-user monthly usage counters, kept alongside the usage_tracking log
+        # so limit checks are a single key lookup; seeded from the log when new
+        counters_exist = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'usage_counters'"
+        ).fetchone()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS usage_counters (
+                user_id TEXT NOT NULL,
+                period TEXT NOT NULL,
+                action_type TEXT NOT NULL,
+                n INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, period, action_type)
+            )
+        """)
+        if not counters_exist:
+            cursor.execute("""
+                INSERT OR IGNORE INTO usage_counters (user_id, period, action_type, n)
+                SELECT user_id, strftime('%Y-%m', action_date), action_type, COUNT(*)
+                FROM usage_tracking
+                GROUP BY 1, 2, 3
+            """)
+        
+        # Add epoch columns to databases created before them; the ISO text holds
+        # naive local times, hence the 'utc' modifier when backfilling
+        for table, column, iso_column in EPOCH_MIGRATION_COLUMNS:
+            cursor.execute(f"PRAGMA table_info({table})")
+            if column not in {row[1] for row in cursor.fetchall()}:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER")
+                cursor.execute(
+                    f"UPDATE {table} SET {column} = CAST(strftime('%s', {iso_column}, 'utc') AS INTEGER) "
+                    f"WHERE {iso_column} IS NOT NULL"
+                )
+        
         # Create indexes
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_subscriptions_user ON subscriptions(user_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_usage_user_date ON usage_tracking(user_id, action_date)")
+        # Monthly usage counts filter on all three columns; this index covers
+        # them and supersedes the old (user_id, action_date) one
+        cursor.execute("DROP INDEX IF EXISTS idx_usage_user_date")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_usage_user_action_date ON usage_tracking(user_id, action_type, action_date)")
         
         conn.commit()
-        conn.close()
     
     def create_user(self, user_id: str, email: Optional[str] = None) -> bool:
         """Create a new user."""
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT OR IGNORE INTO users (user_id, email) VALUES (?, ?)",
-                (user_id, email)
-            )
-            conn.commit()
-            conn.close()
+            conn = _get_connection(self.db_path)
+            with conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO users (user_id, email) VALUES (?, ?)",
+                    (user_id, email)
+                )
             return True
         except Exception as e:
             print(f"Error creating user: {e}")
@@ -144,21 +314,20 @@ class SubscriptionManager:
     ) -> bool:
         """Create a coupon code for free subscription."""
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO coupon_codes 
-                (code, tier, discount_percent, max_uses, valid_until)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                code.upper(),
-                tier,
-                discount_percent,
-                max_uses,
-                valid_until.isoformat() if valid_until else None
-            ))
-            conn.commit()
-            conn.close()
+            conn = _get_connection(self.db_path)
+            with conn:
+                conn.execute("""
+                    INSERT INTO coupon_codes 
+                    (code, tier, discount_percent, max_uses, valid_until, valid_until_epoch)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (
+                    code.upper(),
+                    tier,
+                    discount_percent,
+                    max_uses,
+                    valid_until.isoformat() if valid_until else None,
+                    int(valid_until.timestamp()) if valid_until else None
+                ))
             return True
         except sqlite3.IntegrityError:
             return False  # Code already exists
@@ -166,28 +335,52 @@ class SubscriptionManager:
             print(f"Error creating coupon: {e}")
             return False
     
+    def create_coupon_codes(
+        self,
+        codes: List[str],
+        tier: str,
+        discount_percent: int = 100,
+        max_uses: int = -1,
+        valid_until: Optional[datetime] = None
+    ) -> int:
+        """Create several coupon codes in a single transaction.
+        
+        Returns the number of codes created; codes that already exist are skipped.
+        """
+        valid_until_str = valid_until.isoformat() if valid_until else None
+        valid_until_epoch = int(valid_until.timestamp()) if valid_until else None
+        try:
+            conn = _get_connection(self.db_path)
+            with conn:
+                cursor = conn.executemany("""
+                    INSERT OR IGNORE INTO coupon_codes 
+                    (code, tier, discount_percent, max_uses, valid_until, valid_until_epoch)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, [
+                    (code.upper(), tier, discount_percent, max_uses, valid_until_str, valid_until_epoch)
+                    for code in codes
+                ])
+                created = cursor.rowcount
+            return created
+        except Exception as e:
+            print(f"Error creating coupons: {e}")
+            return 0
+    
     def validate_coupon_code(self, code: str) -> Optional[Dict[str, Any]]:
         """Validate a coupon code and return tier info if valid."""
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT tier, discount_percent, max_uses, current_uses, valid_from, valid_until
+        # Expired codes are filtered out in SQL
+        conn = _get_connection(self.db_path)
+        result = conn.execute("""
+            SELECT tier, discount_percent, max_uses, current_uses
             FROM coupon_codes
             WHERE code = ?
-        """, (code.upper(),))
-        result = cursor.fetchone()
-        conn.close()
+            AND (valid_until_epoch IS NULL OR valid_until_epoch >= ?)
+        """, (code.upper(), int(time.time()))).fetchone()
         
         if not result:
             return None
         
-        tier, discount_percent, max_uses, current_uses, valid_from, valid_until = result
-        
-        # Check if code is expired
-        if valid_until:
-            valid_until_dt = datetime.fromisoformat(valid_until)
-            if datetime.now() > valid_until_dt:
-                return None
+        tier, discount_percent, max_uses, current_uses = result
         
         # Check if code has reached max uses
         if max_uses > 0 and current_uses >= max_uses:
@@ -206,15 +399,6 @@ class SubscriptionManager:
         if not coupon_info:
             return {"success": False, "error": "Invalid or expired coupon code"}
         
-        # Increment usage count
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE coupon_codes
-            SET current_uses = current_uses + 1
-            WHERE code = ?
-        """, (code.upper(),))
-        
         # Create subscription
         tier = coupon_info["tier"]
         subscription_id = f"sub_{secrets.token_hex(16)}"
@@ -225,14 +409,21 @@ class SubscriptionManager:
         else:
             end_date = datetime.now() + timedelta(days=365)  # 1 year for paid tiers
         
-        cursor.execute("""
-            INSERT INTO subscriptions 
-            (subscription_id, user_id, tier, status, end_date, coupon_code)
-            VALUES (?, ?, ?, 'active', ?, ?)
-        """, (subscription_id, user_id, tier, end_date.isoformat(), code.upper()))
-        
-        conn.commit()
-        conn.close()
+        conn = _get_connection(self.db_path)
+        with conn:
+            # Increment usage count
+            conn.execute("""
+                UPDATE coupon_codes
+                SET current_uses = current_uses + 1
+                WHERE code = ?
+            """, (code.upper(),))
+            
+            conn.execute("""
+                INSERT INTO subscriptions 
+                (subscription_id, user_id, tier, status, end_date, end_date_epoch, coupon_code)
+                VALUES (?, ?, ?, 'active', ?, ?, ?)
+            """, (subscription_id, user_id, tier, end_date.isoformat(), int(end_date.timestamp()), code.upper()))
+        _subscription_cache.pop((str(self.db_path), user_id), None)
         
         return {
             "success": True,
@@ -243,31 +434,42 @@ class SubscriptionManager:
     
     def get_user_subscription(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get user's current active subscription."""
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT subscription_id, tier, status, start_date, end_date, coupon_code
+        cache_key = (str(self.db_path), user_id)
+        cached = _subscription_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < SUBSCRIPTION_CACHE_TTL_SECONDS:
+            _, subscription, end_date_epoch = cached
+        else:
+            subscription, end_date_epoch = self._fetch_subscription(user_id)
+            if len(_subscription_cache) >= SUBSCRIPTION_CACHE_MAX_ENTRIES:
+                _subscription_cache.clear()
+            _subscription_cache[cache_key] = (time.monotonic(), subscription, end_date_epoch)
+        
+        if not subscription:
+            return None
+        
+        # Check if subscription is expired
+        if end_date_epoch is not None and time.time() > end_date_epoch:
+            # Mark as expired
+            self._expire_subscription(subscription["subscription_id"], user_id)
+            return None
+        
+        return dict(subscription)
+    
+    def _fetch_subscription(self, user_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[int]]:
+        """Load user's latest active subscription row and its end_date_epoch."""
+        conn = _get_connection(self.db_path)
+        result = conn.execute("""
+            SELECT subscription_id, tier, status, start_date, end_date, end_date_epoch, coupon_code
             FROM subscriptions
             WHERE user_id = ? AND status = 'active'
             ORDER BY start_date DESC
             LIMIT 1
-        """, (user_id,))
-        result = cursor.fetchone()
-        conn.close()
+        """, (user_id,)).fetchone()
         
         if not result:
-            return None
-        
-        subscription_id, tier, status, start_date, end_date, coupon_code = result
-        
-        # Check if subscription is expired
-        if end_date:
-            end_date_dt = datetime.fromisoformat(end_date)
-            if datetime.now() > end_date_dt:
-                # Mark as expired
-                self._expire_subscription(subscription_id)
-                return None
+            return None, None
         
+        subscription_id, tier, status, start_date, end_date, end_date_epoch, coupon_code = result
         tier_info = SUBSCRIPTION_TIERS.get(tier, SUBSCRIPTION_TIERS["free"])
         
         return {
@@ -278,57 +480,74 @@ class SubscriptionManager:
             "end_date": end_date,
             "coupon_code": coupon_code,
             "tier_info": tier_info
-        }
+        }, end_date_epoch
     
-    def _expire_subscription(self, subscription_id: str):
+    def _expire_subscription(self, subscription_id: str, user_id: str):
         """Mark subscription as expired."""
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE subscriptions
-            SET status = 'expired'
-            WHERE subscription_id = ?
-        """, (subscription_id,))
-        conn.commit()
-        conn.close()
+        conn = _get_connection(self.db_path)
+        with conn:
+            conn.execute("""
+                UPDATE subscriptions
+                SET status = 'expired'
+                WHERE subscription_id = ?
+            """, (subscription_id,))
+        _subscription_cache.pop((str(self.db_path), user_id), None)
     
     def track_usage(self, user_id: str, action_type: str, metadata: Optional[Dict] = None):
         """Track user usage for rate limiting."""
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO usage_tracking (user_id, action_type, metadata)
-            VALUES (?, ?, ?)
-        """, (user_id, action_type, json.dumps(metadata) if metadata else None))
-        conn.commit()
-        conn.close()
+        if _usage_flusher is None:
+            _start_usage_flusher()
+        # Timestamped now (UTC, as CURRENT_TIMESTAMP) rather than when the batch is written
+        action_date = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+        _usage_queue.put((
+            str(self.db_path), user_id, action_type, action_date,
+            _json_dumps(metadata) if metadata else None
+        ))
+        if _usage_queue.qsize() >= USAGE_FLUSH_BATCH_SIZE:
+            _usage_batch_ready.set()
     
     def get_monthly_usage(self, user_id: str, action_type: str = "extraction") -> int:
         """Get user's usage count for current month."""
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT COUNT(*) FROM usage_tracking
-            WHERE user_id = ? 
+        _flush_usage()
+        conn = _get_connection(self.db_path)
+        result = conn.execute("""
+            SELECT n FROM usage_counters
+            WHERE user_id = ?
+            AND period = strftime('%Y-%m', 'now')
             AND action_type = ?
-            AND action_date >= datetime('now', 'start of month')
-        """, (user_id, action_type))
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        """, (user_id, action_type)).fetchone()
+        return result[0] if result else 0
     
     def check_usage_limit(self, user_id: str, action_type: str = "extraction") -> Dict[str, Any]:
         """Check if user has exceeded usage limits."""
-        subscription = self.get_user_subscription(user_id)
+        # Fetch the active subscription and this month's usage in one query;
+        # the LEFT JOIN keeps the usage row when there is no subscription
+        _flush_usage()
+        conn = _get_connection(self.db_path)
+        current_usage, subscription_id, tier, end_date_epoch = conn.execute("""
+            SELECT
+                COALESCE((SELECT n FROM usage_counters
+                          WHERE user_id = ?
+                          AND period = strftime('%Y-%m', 'now')
+                          AND action_type = ?), 0),
+                s.subscription_id, s.tier, s.end_date_epoch
+            FROM (SELECT 1)
+            LEFT JOIN subscriptions s ON s.user_id = ? AND s.status = 'active'
+            ORDER BY s.start_date DESC
+            LIMIT 1
+        """, (user_id, action_type, user_id)).fetchone()
         
-        if not subscription:
+        if subscription_id and end_date_epoch is not None and time.time() > end_date_epoch:
+            self._expire_subscription(subscription_id, user_id)
+            subscription_id = None
+        
+        if not subscription_id:
             # No subscription - use free tier limits
             tier_info = SUBSCRIPTION_TIERS["free"]
         else:
-            tier_info = subscription["tier_info"]
+            tier_info = SUBSCRIPTION_TIERS.get(tier, SUBSCRIPTION_TIERS["free"])
         
         max_extractions = tier_info["max_extractions_per_month"]
-        current_usage = self.get_monthly_usage(user_id, action_type)
         
         if max_extractions == -1:  # Unlimited
             return {"allowed": True, "current": current_usage, "limit": "unlimited"}
@@ -345,16 +564,13 @@ class SubscriptionManager:
 
 
 def generate_user_id() -> str:
-    """Generate a unique user ID based on session."""
+    """Generate a unique user ID for the session."""
     try:
         import streamlit as st
         if 'user_id' not in st.session_state:
-            # Generate a unique ID based on session info
-            session_info = f"{st.session_state.get('_session_id', '')}_{datetime.now().isoformat()}"
-            user_id = hashlib.sha256(session_info.encode()).hexdigest()[:16]
-            st.session_state.user_id = user_id
+            # Random, not derived from session info: nothing needs to reproduce it
+            st.session_state.user_id = secrets.token_hex(8)
         return st.session_state.user_id
     except ImportError:
         # Fallback if streamlit is not available
-        return hashlib.sha256(f"{os.getpid()}_{datetime.now().isoformat()}".encode()).hexdigest()[:16]
-
+        return secrets.token_hex(8)